@@ -0,0 +1,4 @@
+from aoc.runner import main
+
+
+main()
@@ -0,0 +1,78 @@
+"""
+Aho-Corasick automaton: every occurrence of a whole dictionary of words in one
+left to right pass over a text, however many words there are:
+
+    automaton = AhoCorasick(["XMAS", "SANTA", "MAS"])
+    automaton.count(["XMASANTA", "MMAS"])  # [1, 1, 2]
+    list(automaton.find("XMAS"))  # [(4, 0), (4, 2)], as (end index, word index)
+
+The failure links are compiled into a full transition table, so each character
+costs a single dict lookup.
+"""
+from collections import deque
+from typing import Iterable, Iterator
+
+
+class AhoCorasick:
+    def __init__(self, words: Iterable[str]):
+        self.words = list(words)
+        if any(len(word) == 0 for word in self.words):
+            raise ValueError("Words can't be empty")
+        # Trie of the words, state 0 is the root
+        children: list[dict[str, int]] = [{}]
+        endings: list[list[int]] = [[]]
+        for index, word in enumerate(self.words):
+            state = 0
+            for char in word:
+                if char not in children[state]:
+                    children[state][char] = len(children)
+                    children.append({})
+                    endings.append([])
+                state = children[state][char]
+            endings[state].append(index)
+
+        # Breadth first, so that the failure state of a state (its longest proper suffix in the trie) is done
+        self.transitions: list[dict[str, int]] = [{} for _ in children]
+        self.outputs: list[tuple[int, ...]] = [()] * len(children)
+        self.transitions[0] = dict(children[0])
+        queue = deque((child, 0) for child in children[0].values())
+        while len(queue) > 0:
+            state, failure = queue.popleft()
+            self.outputs[state] = tuple(endings[state]) + self.outputs[failure]
+            self.transitions[state] = {**self.transitions[failure], **children[state]}
+            for char, child in children[state].items():
+                queue.append((child, self.transitions[failure].get(char, 0)))
+
+    def visits(self, texts: Iterable[str]) -> list[int]:
+        """
+        How many times each state is reached, the automaton starting over at the root for every text.
+        """
+        transitions = self.transitions
+        visits = [0] * len(transitions)
+        for text in texts:
+            state = 0
+            for char in text:
+                state = transitions[state].get(char, 0)
+                visits[state] += 1
+        return visits
+
+    def count(self, texts: Iterable[str]) -> list[int]:
+        """
+        Occurrences of each word over all the texts, overlapping ones included.
+        """
+        counts = [0] * len(self.words)
+        for state, visits in enumerate(self.visits(texts)):
+            if visits > 0:
+                for index in self.outputs[state]:
+                    counts[index] += visits
+        return counts
+
+    def find(self, text: str) -> Iterator[tuple[int, int]]:
+        """
+        ``(end, word index)`` of every occurrence in the text, ``end`` being one past its last character.
+        """
+        state = 0
+        for position, char in enumerate(text):
+            state = self.transitions[state].get(char, 0)
+            for index in self.outputs[state]:
+                yield position + 1, index
@@ -0,0 +1,131 @@
+"""
+Performance regression gate on top of ``aoc.benchmark``.
+
+Record the median time of every timed solver of a day into a baseline file,
+then compare later runs against it:
+
+    python -m aoc.baseline record 7 11
+    python -m aoc.baseline compare 7 11 --tolerance 20
+
+``compare`` exits with a non-zero status when a solver is slower than its
+stored median by more than the tolerance (in percent), or when a solver with a
+baseline no longer exists, e.g. after a rename.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Optional
+
+from aoc.benchmark import BenchmarkResult, benchmark_day, day_name, get_solvers, load_day
+
+
+DEFAULT_BASELINE_FILE = "baselines.json"
+
+Baselines = dict[str, dict[str, dict[str, float]]]
+
+
+def load_baselines(filename: str) -> Baselines:
+    if not Path(filename).exists():
+        return {}
+    with open(filename) as fin:
+        return json.load(fin)
+
+
+def save_baselines(baselines: Baselines, filename: str):
+    with open(filename, "w") as fout:
+        json.dump(baselines, fout, indent=2, sort_keys=True)
+        fout.write("\n")
+
+
+def record(results: list[BenchmarkResult], baselines: Baselines) -> Baselines:
+    for result in results:
+        baselines.setdefault(result.day, {})[result.solver] = {
+            "median": result.median,
+            "min": result.min,
+            "repeats": result.repeats,
+        }
+    return baselines
+
+
+def compare(results: list[BenchmarkResult], baselines: Baselines, tolerance: float) -> list[str]:
+    """
+    Returns a description of every solver that is over budget. The budget of a solver is its
+    stored median plus ``tolerance`` percent.
+    """
+    regressions = []
+    for result in results:
+        baseline = baselines.get(result.day, {}).get(result.solver)
+        if baseline is None:
+            print(f"{result.day} {result.solver}: no baseline, skipped")
+            continue
+        budget = baseline["median"] * (1 + tolerance / 100)
+        change = (result.median / baseline["median"] - 1) * 100
+        status = "OK" if result.median <= budget else "REGRESSION"
+        message = (f"{result.day} {result.solver}: {result.median:.6f}s vs baseline {baseline['median']:.6f}s "
+                   f"({change:+.1f}%, budget {budget:.6f}s) {status}")
+        print(message)
+        if status != "OK":
+            regressions.append(message)
+    return regressions
+
+
+def find_missing(day, solvers: list[str]) -> list[str]:
+    """
+    Returns the solvers that the day no longer has.
+    """
+    available = get_solvers(load_day(day))
+    missing = [solver for solver in solvers if solver not in available]
+    for solver in missing:
+        print(f"{day_name(day)} {solver}: no such timed solver, missing")
+    return missing
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Record or check timing baselines of the timed solvers.")
+    parser.add_argument("mode", choices=("record", "compare"))
+    parser.add_argument("days", nargs="+", help="Days to benchmark, e.g. 7 or day_7")
+    parser.add_argument("--solver", action="append", dest="solvers",
+                        help="Only this solver (repeatable). Defaults to all solvers in compare mode that "
+                             "have a baseline, and to all timed solvers in record mode")
+    parser.add_argument("--file", default=DEFAULT_BASELINE_FILE, help="Baseline file")
+    parser.add_argument("--tolerance", type=float, default=10.0,
+                        help="Allowed slowdown over the baseline median, in percent")
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    baselines = load_baselines(args.file)
+    results = []
+    missing = []
+    for day in args.days:
+        solvers = args.solvers
+        if solvers is None and args.mode == "compare":
+            solvers = list(baselines.get(day_name(day), {}))
+            if len(solvers) == 0:
+                print(f"{day_name(day)}: no baselines in {args.file}, skipped")
+                continue
+        if args.mode == "compare":
+            day_missing = find_missing(day, solvers)
+            missing.extend(f"{day_name(day)} {solver}" for solver in day_missing)
+            solvers = [solver for solver in solvers if solver not in day_missing]
+            if len(solvers) == 0:
+                continue
+        results.extend(benchmark_day(day, solvers, args.warmup, args.repeats))
+
+    if args.mode == "record":
+        save_baselines(record(results, baselines), args.file)
+        print(f"Recorded {len(results)} baselines in {args.file}")
+        return
+
+    regressions = compare(results, baselines, args.tolerance)
+    if len(regressions) > 0:
+        print(f"{len(regressions)} solver(s) over budget")
+    if len(missing) > 0:
+        print(f"{len(missing)} solver(s) missing: {', '.join(missing)}")
+    if len(regressions) > 0 or len(missing) > 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
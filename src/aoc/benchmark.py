@@ -0,0 +1,197 @@
+"""
+Shared timing helpers for the daily solvers.
+
+Decorate a solver with ``@timed`` to print its wall time on every call, and
+to make it discoverable by the benchmark runner:
+
+    python -m aoc.benchmark day_7 --warmup 1 --repeats 10 --json report.json
+
+With ``AOC_PROFILE`` set, every timed call is also profiled, see ``aoc.profiling``.
+"""
+import argparse
+import contextlib
+import importlib
+import inspect
+import io
+import json
+import math
+import statistics
+import sys
+import time
+from dataclasses import dataclass, asdict
+from functools import wraps
+from pathlib import Path
+from types import ModuleType
+from typing import Callable, Optional
+
+from aoc.profiling import profiling_enabled, run_profiled
+
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+
+
+def timed(arg=None):
+    def decorator(func):
+        custom_name = arg if isinstance(arg, str) else None
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if profiling_enabled():
+                day = Path(sys.modules[func.__module__].__file__).parent.name
+                result, report = run_profiled(f"{day}.{wrapper.timed_name}", func, *args, **kwargs)
+                print(report)
+                return result
+            start_time = time.perf_counter()
+            result = func(*args, **kwargs)
+            end_time = time.perf_counter()
+            elapsed_time = end_time - start_time
+            print(f"Function '{wrapper.timed_name}' executed in {elapsed_time:.6f} seconds.")
+            return result
+        wrapper.timed_name = custom_name or func.__name__
+        return wrapper
+    if callable(arg):
+        return decorator(arg)
+    return decorator
+
+
+def day_name(day) -> str:
+    if isinstance(day, int) or str(day).isdecimal():
+        return f"day_{int(day)}"
+    return str(day)
+
+
+def default_input(day) -> Path:
+    return SRC_DIR / day_name(day) / "input.txt"
+
+
+def load_day(day) -> ModuleType:
+    if str(SRC_DIR) not in sys.path:
+        sys.path.insert(0, str(SRC_DIR))
+    return importlib.import_module(f"{day_name(day)}.main")
+
+
+def get_solvers(module: ModuleType) -> dict[str, Callable]:
+    """
+    Every ``part*`` attribute of a day module that went through ``@timed``.
+    """
+    return {
+        name: value for name, value in vars(module).items()
+        if name.startswith("part") and hasattr(value, "timed_name")
+    }
+
+
+def solver_kwargs(solver: Callable, params: dict) -> dict:
+    """
+    The subset of ``params`` that ``solver`` accepts, e.g. ``blinks`` for day 11 or ``size`` for day 18.
+    """
+    accepted = inspect.signature(solver).parameters
+    return {key: value for key, value in params.items() if key in accepted}
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    # Nearest-rank percentile, so the value is always one of the real timings
+    ordered = sorted(values)
+    rank = max(math.ceil(fraction * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+@dataclass
+class BenchmarkResult:
+    day: str
+    solver: str
+    warmup: int
+    repeats: int
+    timings: list[float]
+
+    @property
+    def min(self) -> float:
+        return min(self.timings)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.timings)
+
+    @property
+    def p95(self) -> float:
+        return percentile(self.timings, 0.95)
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "min": self.min, "median": self.median, "p95": self.p95}
+
+    def __str__(self):
+        return (f"{self.day} {self.solver}: min {self.min:.6f}s, median {self.median:.6f}s, "
+                f"p95 {self.p95:.6f}s ({self.repeats} runs)")
+
+
+def benchmark(func: Callable, warmup: int = 1, repeats: int = 5, day: Optional[str] = None,
+              args: tuple = (), kwargs: Optional[dict] = None) -> BenchmarkResult:
+    """
+    Run a ``@timed`` solver ``warmup + repeats`` times with its output silenced and keep the
+    timings of the last ``repeats`` runs.
+    """
+    if repeats < 1:
+        raise ValueError("At least one repeat is needed to compute statistics.")
+    kwargs = kwargs or {}
+    solver = getattr(func, "__wrapped__", func)
+    day = day or day_name(Path(sys.modules[func.__module__].__file__).parent.name)
+    timings = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(warmup + repeats):
+            start_time = time.perf_counter()
+            solver(*args, **kwargs)
+            end_time = time.perf_counter()
+            if i >= warmup:
+                timings.append(end_time - start_time)
+    return BenchmarkResult(day, getattr(func, "timed_name", func.__name__), warmup, repeats, timings)
+
+
+def benchmark_day(day, solver_names: Optional[list[str]] = None, warmup: int = 1, repeats: int = 5,
+                  raw: Optional[str] = None, params: Optional[dict] = None) -> list[BenchmarkResult]:
+    module = load_day(day)
+    if raw is None:
+        raw = default_input(day).read_text()
+    solvers = get_solvers(module)
+    if solver_names:
+        unknown = set(solver_names) - set(solvers)
+        if unknown:
+            raise ValueError(f"Unknown solvers for {day_name(day)}: {', '.join(sorted(unknown))}")
+        solvers = {name: solvers[name] for name in solver_names}
+    results = []
+    for name, solver in solvers.items():
+        result = benchmark(solver, warmup, repeats, day=day_name(day), args=(raw,),
+                           kwargs=solver_kwargs(solver, params or {}))
+        result.solver = name
+        print(result)
+        results.append(result)
+    return results
+
+
+def write_report(results: list[BenchmarkResult], filename: str):
+    with open(filename, "w") as fout:
+        json.dump([result.to_dict() for result in results], fout, indent=2)
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark the timed solvers of one or more days.")
+    parser.add_argument("days", nargs="+", help="Days to benchmark, e.g. 7 or day_7")
+    parser.add_argument("--solver", action="append", dest="solvers",
+                        help="Only benchmark this solver (repeatable), e.g. part2_prune")
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--json", dest="json_file", help="Write a machine-readable report to this file")
+    parser.add_argument("--input", help="Input file to benchmark with, instead of each day's input.txt")
+    parser.add_argument("--param", action="append", default=[],
+                        help="Solver parameter as key=value (repeatable), see python -m aoc --help")
+    args = parser.parse_args(argv)
+
+    from aoc.runner import parse_param, read_input
+    raw = read_input(args.input) if args.input else None
+    params = dict(parse_param(param) for param in args.param)
+    results = []
+    for day in args.days:
+        results.extend(benchmark_day(day, args.solvers, args.warmup, args.repeats, raw, params))
+    if args.json_file:
+        write_report(results, args.json_file)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+On-disk cache of parsed inputs, keyed by the SHA-256 of the raw input text.
+
+A parser is wrapped with an ``encode`` function turning its result into named
+fields (ints, strings, ``array.array`` or ``bytes``) and a ``decode`` function
+building the result back from them:
+
+    @cached("day_18.walls", encode_walls, decode_walls)
+    def get_data(raw: str):
+        ...
+
+The first run for an input parses it and writes the fields to
+``<cache dir>/<name>-v<version>-<sha256>.bin``. Later runs memory-map that file
+and hand the arrays to ``decode`` as ``memoryview`` objects over the mapping,
+so nothing is parsed or copied unless ``decode`` copies it.
+
+The cache lives in ``.aoc_cache`` next to ``src`` unless ``AOC_CACHE_DIR`` is
+set, and is bypassed entirely with ``AOC_CACHE=0``. It is kept under
+``AOC_CACHE_MAX_BYTES`` (256 MiB by default) by deleting the least recently used
+files after every write, and at most ``MAX_MAPPINGS`` files stay mapped at once.
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from collections import OrderedDict
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, TypeVar, Union
+
+from aoc.benchmark import SRC_DIR
+from aoc.grid import Grid
+
+
+T = TypeVar("T")
+
+Field = Union[int, str, array, bytes, bytearray]
+Fields = dict[str, Field]
+
+MAGIC = b"AOCC"
+# Magic, header length
+PREAMBLE = struct.Struct("<4sI")
+# Arrays start on a multiple of this so that they can be cast in place
+ALIGNMENT = 8
+
+# Mapped files, least recently used first. Each one holds a file descriptor, so only the most recent
+# are kept, older ones being closed or, if memoryviews decoded from them are still alive, left to close
+# with the last of them
+MAX_MAPPINGS = 32
+_mappings: OrderedDict[Path, mmap.mmap] = OrderedDict()
+
+MAX_CACHE_BYTES = 256 * 2 ** 20
+
+
+def cache_dir() -> Path:
+    return Path(os.environ.get("AOC_CACHE_DIR", SRC_DIR.parent / ".aoc_cache"))
+
+
+def cache_enabled() -> bool:
+    return os.environ.get("AOC_CACHE", "1") != "0"
+
+
+def cache_max_bytes() -> int:
+    return int(os.environ.get("AOC_CACHE_MAX_BYTES", MAX_CACHE_BYTES))
+
+
+def _release(path: Path):
+    mapping = _mappings.pop(path, None)
+    if mapping is None:
+        return
+    try:
+        mapping.close()
+    except BufferError:
+        # Still exported, it is closed once the memoryviews over it are gone
+        pass
+
+
+def prune(directory: Path, max_bytes: int):
+    """
+    Delete the least recently used cache files until the directory holds at most ``max_bytes``.
+    """
+    entries = []
+    for path in directory.glob("*.bin"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        _release(path)
+        try:
+            path.unlink()
+        except OSError:
+            continue
+        total -= size
+
+
+def input_key(raw: str) -> str:
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _pad(offset: int) -> int:
+    return -offset % ALIGNMENT
+
+
+def save(path: Path, fields: Fields):
+    """
+    Write the fields as a JSON header followed by the raw array buffers. The file is replaced atomically.
+    """
+    scalars = {}
+    buffers: list[tuple[str, str, bytes]] = []
+    for name, value in fields.items():
+        if isinstance(value, array):
+            buffers.append((name, value.typecode, value.tobytes()))
+        elif isinstance(value, (bytes, bytearray)):
+            buffers.append((name, "B", bytes(value)))
+        elif isinstance(value, (int, str)):
+            scalars[name] = value
+        else:
+            raise TypeError(f"Cannot cache field {name!r} of type {type(value).__name__}")
+
+    # Offsets are relative to the end of the header, which is itself padded to the alignment
+    arrays = {}
+    offset = 0
+    for name, typecode, data in buffers:
+        arrays[name] = [typecode, offset, len(data)]
+        offset += len(data) + _pad(len(data))
+    header = json.dumps({"byteorder": sys.byteorder, "scalars": scalars, "arrays": arrays}).encode()
+    header += b" " * _pad(PREAMBLE.size + len(header))
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fout:
+            fout.write(PREAMBLE.pack(MAGIC, len(header)))
+            fout.write(header)
+            for _, _, data in buffers:
+                fout.write(data)
+                fout.write(b"\0" * _pad(len(data)))
+        os.replace(temp_name, path)
+    except BaseException:
+        os.unlink(temp_name)
+        raise
+
+
+def load(path: Path) -> dict[str, Any]:
+    """
+    Memory-map a file written by ``save``. Arrays come back as read-only memoryviews cast to their typecode.
+    """
+    mapping = _mappings.get(path)
+    if mapping is None:
+        with open(path, "rb") as fin:
+            mapping = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ)
+        _mappings[path] = mapping
+        while len(_mappings) > MAX_MAPPINGS:
+            _release(next(iter(_mappings)))
+    else:
+        _mappings.move_to_end(path)
+    magic, header_length = PREAMBLE.unpack_from(mapping)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a parsed input cache file")
+    header = json.loads(mapping[PREAMBLE.size:PREAMBLE.size + header_length])
+    if header["byteorder"] != sys.byteorder:
+        raise ValueError(f"{path} was written on a {header['byteorder']}-endian machine")
+
+    view = memoryview(mapping)
+    data_start = PREAMBLE.size + header_length
+    fields: dict[str, Any] = dict(header["scalars"])
+    for name, (typecode, offset, length) in header["arrays"].items():
+        start = data_start + offset
+        if start + length > len(mapping):
+            raise ValueError(f"{path} is truncated")
+        fields[name] = view[start:start + length].cast(typecode)
+    return fields
+
+
+def cached(name: str, encode: Callable[[T], Fields], decode: Callable[[dict[str, Any]], T],
+           version: int = 1) -> Callable[[Callable[[str], T]], Callable[[str], T]]:
+    """
+    Cache a ``parse(raw)`` function. Bump ``version`` whenever ``encode`` changes its output.
+    """
+    def decorator(parse: Callable[[str], T]) -> Callable[[str], T]:
+        @wraps(parse)
+        def wrapper(raw: str) -> T:
+            if not cache_enabled():
+                return parse(raw)
+            path = cache_dir() / f"{name}-v{version}-{input_key(raw)}.bin"
+            if path.exists():
+                try:
+                    decoded = decode(load(path))
+                    # The modification time orders files for pruning
+                    os.utime(path)
+                    return decoded
+                except (OSError, ValueError, KeyError, TypeError, struct.error):
+                    # Unreadable or stale, parse again and overwrite it
+                    _release(path)
+            parsed = parse(raw)
+            try:
+                save(path, encode(parsed))
+                prune(path.parent, cache_max_bytes())
+            except (OverflowError, ValueError, TypeError):
+                # Not cacheable, such as integers beyond int64, so parsed on every run
+                pass
+            except OSError:
+                # A read-only or full disk only costs the speed-up
+                pass
+            return parsed
+        wrapper.parse = parse
+        return wrapper
+    return decorator
+
+
+def encode_grid(grid: Grid) -> Fields:
+    return {"width": grid.width, "height": grid.height, "cells": grid.cells}
+
+
+def decode_grid(fields: dict[str, Any]) -> Grid:
+    # Solvers write to their grid, so copy the cells out of the read-only mapping
+    return Grid(fields["width"], fields["height"], bytearray(fields["cells"]))
+
+
+parse_grid = cached("grid", encode_grid, decode_grid)(Grid.parse)
+
+
+def encode_rows(rows: list[list[int]], prefix: str = "") -> Fields:
+    """
+    Ragged integer rows as one flat array plus the offset where every row ends.
+    """
+    flat = array("q")
+    ends = array("q")
+    for row in rows:
+        flat.extend(row)
+        ends.append(len(flat))
+    return {f"{prefix}flat": flat, f"{prefix}ends": ends}
+
+
+def decode_rows(fields: dict[str, Any], prefix: str = "") -> list[list[int]]:
+    flat = fields[f"{prefix}flat"]
+    rows = []
+    start = 0
+    for end in fields[f"{prefix}ends"]:
+        rows.append(flat[start:end].tolist())
+        start = end
+    return rows
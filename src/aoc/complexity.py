@@ -0,0 +1,250 @@
+"""
+Measure how each solver scales and compare it with the complexity stated in the code:
+
+    python -m aoc.complexity 3 --min-scale 0.5 --max-scale 8 --steps 5
+    python -m aoc.complexity 2 12 --solver part2 --json complexity.json
+
+Every solver runs on synthetic inputs (see ``aoc.generate``) of geometrically
+growing size. The exponent ``k`` of ``time ~ n^k``, with ``n`` the input size in
+characters, is the slope of the least-squares fit of log(time) against log(n).
+
+The stated complexity is the first ``O(...)`` in the comment block right above
+the solver, e.g. ``# O(n) worst case`` in day 3. Without one, the solver is run
+once on the smallest input with the same parameters, so with the engine that is
+measured, and the first function of its module that it calls (methods of the
+module's classes included) with such a comment is used. Only expressions of
+``n`` have an exponent, others such as ``O(k + r)`` are reported as unknown.
+Solvers whose measured exponent is off from the stated one by more than
+``--tolerance`` are flagged.
+
+The parsed-input cache is disabled while measuring, so that every run pays for
+its own parsing and the cache does not fill up with generated inputs.
+"""
+import argparse
+import contextlib
+import inspect
+import io
+import json
+import math
+import os
+import re
+import sys
+from dataclasses import dataclass, asdict
+from types import ModuleType
+from typing import Callable, Optional
+
+from aoc.benchmark import benchmark, day_name, get_solvers, load_day, solver_kwargs
+from aoc.generate import generate
+
+
+STATED_PATTERN = re.compile(r"O\(((?:[^()]|\([^()]*\))*)\)")
+
+
+@dataclass
+class Sample:
+    scale: float
+    size: int
+    seconds: float
+
+
+@dataclass
+class ComplexityReport:
+    day: str
+    solver: str
+    stated: Optional[str]
+    stated_exponent: Optional[float]
+    exponent: Optional[float]
+    r_squared: Optional[float]
+    samples: list[Sample]
+    mismatch: bool = False
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def __str__(self):
+        measured = "not enough samples"
+        if self.exponent is not None:
+            measured = f"n^{self.exponent:.2f} (r²={self.r_squared:.2f})"
+        stated = f"O({self.stated})" if self.stated is not None else "not stated"
+        if self.stated is not None and self.stated_exponent is None:
+            stated += " (exponent unknown)"
+        flag = "  <-- MISMATCH" if self.mismatch else ""
+        return f"{self.day} {self.solver}: measured {measured}, stated {stated}{flag}"
+
+
+def stated_exponent(stated: str) -> Optional[float]:
+    """
+    Polynomial degree of a big-O expression: ``1`` -> 0, ``n`` and ``4n`` -> 1, ``n^2`` -> 2,
+    ``n log n`` -> 1 (log factors are not visible in a fit), exponentials -> inf. None for expressions of
+    anything but ``n``, whose growth with the input size is unknown.
+
+    >>> stated_exponent("n * log n")
+    1.0
+    >>> stated_exponent("n * n + log n")
+    2.0
+    """
+    expression = stated.replace(" ", "").replace("**", "^")
+    # Spaces are gone, so n log n is the single name nlogn
+    if not all(re.fullmatch(r"(?:n|log)+", name) for name in re.findall(r"[A-Za-z_]+", expression)):
+        return None
+    if re.search(r"\^\(?n", expression):
+        return math.inf
+    # Log factors count for nothing, whether multiplied in or not
+    expression = re.sub(r"log(?:\^\d+)?\(?n(?:\^\d+(?:\.\d+)?)?\)?", "", expression)
+    # Powers multiply within a term, and only the largest term counts
+    return max(sum((float(power) if power else 1.0
+                    for power in re.findall(r"n(?:\^(\d+(?:\.\d+)?))?", term)), 0.0)
+               for term in expression.split("+"))
+
+
+def _stated_in(func: Callable) -> Optional[str]:
+    try:
+        comments = inspect.getcomments(inspect.unwrap(func))
+    except (OSError, TypeError):
+        return None
+    match = STATED_PATTERN.search(comments or "")
+    return match.group(1) if match else None
+
+
+def module_functions(module: ModuleType) -> dict:
+    """
+    Functions defined in the module, and the methods of its classes, by code object.
+    """
+    functions = {}
+    for value in vars(module).values():
+        if inspect.isclass(value) and value.__module__ == module.__name__:
+            candidates = [inspect.unwrap(member) for member in vars(value).values() if inspect.isfunction(member)]
+        elif inspect.isfunction(value) and value.__module__ == module.__name__:
+            candidates = [inspect.unwrap(value)]
+        else:
+            continue
+        for function in candidates:
+            functions[function.__code__] = function
+    return functions
+
+
+def called_functions(solver: Callable, module: ModuleType, raw: str, kwargs: dict) -> list[Callable]:
+    """
+    The functions of the module that one run of the solver calls, in the order of their first call.
+    """
+    functions = module_functions(module)
+    called = {}
+
+    def on_call(frame, event, _):
+        if event == "call" and frame.f_code in functions and frame.f_code not in called:
+            called[frame.f_code] = functions[frame.f_code]
+
+    sys.setprofile(on_call)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            solver(raw, **kwargs)
+    finally:
+        sys.setprofile(None)
+    return list(called.values())
+
+
+def stated_complexity(solver: Callable, module: ModuleType, raw: str, kwargs: dict) -> Optional[str]:
+    """
+    The complexity stated above the solver, or else above the first function of its module that it calls
+    when run on ``raw`` with ``kwargs``.
+    """
+    stated = _stated_in(solver)
+    if stated is not None:
+        return stated
+    for helper in called_functions(solver, module, raw, kwargs):
+        stated = _stated_in(helper)
+        if stated is not None:
+            return stated
+    return None
+
+
+def fit_exponent(samples: list[Sample]) -> tuple[Optional[float], Optional[float]]:
+    """
+    Slope and r² of the least-squares line through (log n, log time).
+    """
+    points = [(math.log(sample.size), math.log(sample.seconds)) for sample in samples if sample.seconds > 0]
+    if len({x for x, _ in points}) < 2:
+        return None, None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    sxx = sum((x - mean_x) ** 2 for x, _ in points)
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    syy = sum((y - mean_y) ** 2 for _, y in points)
+    slope = sxy / sxx
+    r_squared = sxy ** 2 / (sxx * syy) if syy > 0 else 1.0
+    return slope, r_squared
+
+
+def geometric_scales(min_scale: float, max_scale: float, steps: int) -> list[float]:
+    if steps < 2:
+        raise ValueError("At least two scales are needed to fit an exponent.")
+    ratio = (max_scale / min_scale) ** (1 / (steps - 1))
+    return [min_scale * ratio ** i for i in range(steps)]
+
+
+def profile_day(day, scales: list[float], solver_names: Optional[list[str]] = None, repeats: int = 3,
+                seed: int = 0, budget: float = 10.0, tolerance: float = 0.3,
+                params: Optional[dict] = None) -> list[ComplexityReport]:
+    """
+    Time every solver over the scales. A solver stops growing once a run takes more than ``budget`` seconds.
+    """
+    module = load_day(day)
+    solvers = get_solvers(module)
+    if solver_names:
+        solvers = {name: solver for name, solver in solvers.items() if name in solver_names}
+    inputs = [(scale, generate(day, scale, seed)) for scale in scales]
+    reports = []
+    for name, solver in solvers.items():
+        samples = []
+        for scale, generated in inputs:
+            kwargs = solver_kwargs(solver, {**generated.params, **(params or {})})
+            result = benchmark(solver, warmup=0, repeats=repeats, day=day_name(day), args=(generated.raw,),
+                               kwargs=kwargs)
+            samples.append(Sample(scale, len(generated.raw), result.min))
+            if result.min > budget:
+                break
+        smallest = inputs[0][1]
+        stated = stated_complexity(solver, module, smallest.raw,
+                                   solver_kwargs(solver, {**smallest.params, **(params or {})}))
+        expected = stated_exponent(stated) if stated is not None else None
+        exponent, r_squared = fit_exponent(samples)
+        mismatch = expected is not None and exponent is not None and abs(exponent - expected) > tolerance
+        report = ComplexityReport(day_name(day), name, stated, expected, exponent, r_squared, samples, mismatch)
+        print(report, flush=True)
+        reports.append(report)
+    return reports
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Fit the empirical complexity exponent of each solver.")
+    parser.add_argument("days", nargs="+", help="Days to profile, e.g. 3 or day_3")
+    parser.add_argument("--solver", action="append", dest="solvers", help="Only profile this solver (repeatable)")
+    parser.add_argument("--min-scale", type=float, default=0.5)
+    parser.add_argument("--max-scale", type=float, default=4.0)
+    parser.add_argument("--steps", type=int, default=4, help="Number of input sizes, spaced geometrically")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per size, the fastest one is kept")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--budget", type=float, default=10.0,
+                        help="Stop growing a solver's input once a run takes this many seconds")
+    parser.add_argument("--tolerance", type=float, default=0.3,
+                        help="Flag solvers whose exponent differs from the stated one by more than this")
+    parser.add_argument("--param", action="append", default=[],
+                        help="Solver parameter as key=value (repeatable), see python -m aoc --help")
+    parser.add_argument("--json", dest="json_file", help="Write the report to this file")
+    args = parser.parse_args(argv)
+
+    from aoc.runner import parse_param
+    os.environ["AOC_CACHE"] = "0"
+    scales = geometric_scales(args.min_scale, args.max_scale, args.steps)
+    params = dict(parse_param(param) for param in args.param)
+    reports = []
+    for day in args.days:
+        reports.extend(profile_day(day, scales, args.solvers, args.repeats, args.seed, args.budget,
+                                   args.tolerance, params))
+    if args.json_file:
+        with open(args.json_file, "w") as fout:
+            json.dump([report.to_dict() for report in reports], fout, indent=2)
+
+
+if __name__ == "__main__":
+    main()
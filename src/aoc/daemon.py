@@ -0,0 +1,155 @@
+"""
+Warm solver daemon on a Unix domain socket. The server imports every day once and
+then answers solve requests without interpreter start-up, imports or file reads:
+
+    python -m aoc.daemon serve &
+    python -m aoc.daemon solve 11 --part part2_fast --input day_11/input.txt --param blinks=40
+    cat input.txt | python -m aoc.daemon solve 3 --input -
+    python -m aoc.daemon stop
+
+The protocol is one JSON object per line, in both directions, and a connection
+can carry any number of requests:
+
+    {"day": 7, "part": "part2_prune", "input": "190: 10 19\\n...", "params": {}}
+    {"ok": true, "day": "day_7", "part": "part2_prune", "input": "<request>", "result": 190, "seconds": 0.0001, ...}
+    {"ok": false, "error": "ValueError: Unknown parts for day_7: part3. ..."}
+
+``{"command": "ping"}`` and ``{"command": "shutdown"}`` are also understood.
+Requests are served one at a time, since solvers share module-level state.
+"""
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+from typing import Any, Optional
+
+from aoc.benchmark import default_input, load_day
+from aoc.runner import STDIN, parse_param, read_input, solve
+from aoc.scheduler import all_days
+
+
+def default_socket() -> str:
+    return os.environ.get("AOC_SOCKET", f"/tmp/aoc-{os.getuid()}.sock")
+
+
+class SolveHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                reply = self.server.answer(json.loads(line))
+            except Exception as e:
+                reply = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            self.wfile.write(json.dumps(reply).encode() + b"\n")
+            self.wfile.flush()
+            if reply.get("shutdown"):
+                return
+
+
+class SolverServer(socketserver.UnixStreamServer):
+    def __init__(self, socket_path: str, days: Optional[list[str]] = None):
+        self.socket_path = socket_path
+        self.days = days or all_days()
+        # Import everything up front so that the first request is as fast as the others
+        for day in self.days:
+            load_day(day)
+        self.requests_served = 0
+        super().__init__(socket_path, SolveHandler)
+
+    def answer(self, request: dict) -> dict:
+        command = request.get("command", "solve")
+        if command == "ping":
+            return {"ok": True, "days": self.days, "requests_served": self.requests_served}
+        if command == "shutdown":
+            # shutdown() waits for serve_forever() to return, so it can't run on the serving thread
+            threading.Thread(target=self.shutdown).start()
+            return {"ok": True, "shutdown": True}
+        if command != "solve":
+            raise ValueError(f"Unknown command '{command}'")
+        solved = solve(request["day"], request["part"], request["input"], request.get("params") or {},
+                       request.get("input_name", "<request>"), quiet=True)
+        self.requests_served += 1
+        return {"ok": True, **solved.to_dict()}
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+def serve(socket_path: str, days: Optional[list[str]] = None):
+    if os.path.exists(socket_path):
+        try:
+            request(socket_path, {"command": "ping"})
+        except OSError:
+            # Left over by a daemon that didn't exit cleanly
+            os.unlink(socket_path)
+        else:
+            raise RuntimeError(f"A daemon is already listening on {socket_path}")
+    with SolverServer(socket_path, days) as server:
+        print(f"Serving {len(server.days)} days on {socket_path}", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def request(socket_path: str, message: dict) -> dict:
+    """
+    Send one request to a running daemon and wait for its reply.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        with client.makefile("rwb") as stream:
+            stream.write(json.dumps(message).encode() + b"\n")
+            stream.flush()
+            reply = stream.readline()
+    if not reply:
+        raise ConnectionError("The daemon closed the connection without replying")
+    return json.loads(reply)
+
+
+def solve_remote(day, part: str, raw: str, params: Optional[dict] = None, socket_path: Optional[str] = None,
+                 input_name: str = "<request>") -> dict[str, Any]:
+    return request(socket_path or default_socket(),
+                   {"day": day, "part": part, "input": raw, "params": params or {}, "input_name": input_name})
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Warm solver daemon on a Unix socket.")
+    parser.add_argument("--socket", default=default_socket(), help="Socket path, defaults to $AOC_SOCKET")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser("serve", help="Run the daemon in the foreground")
+    serve_parser.add_argument("days", nargs="*", help="Days to load, defaults to every day")
+    solve_parser = commands.add_parser("solve", help="Send solve requests to a running daemon")
+    solve_parser.add_argument("day")
+    solve_parser.add_argument("--part", "-p", action="append", dest="parts", required=True)
+    solve_parser.add_argument("--input", "-i", help=f"Input file, '{STDIN}' for stdin. Defaults to the day's input.txt")
+    solve_parser.add_argument("--param", action="append", type=parse_param, default=[],
+                              help="Solver parameter as key=value (repeatable)")
+    commands.add_parser("ping", help="Check that the daemon is up")
+    commands.add_parser("stop", help="Shut the daemon down")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        serve(args.socket, args.days or None)
+    elif args.command == "solve":
+        input_name = args.input or str(default_input(args.day))
+        raw = read_input(input_name)
+        failed = False
+        for part in args.parts:
+            reply = solve_remote(args.day, part, raw, dict(args.param), args.socket, input_name)
+            print(json.dumps(reply))
+            failed = failed or not reply["ok"]
+        if failed:
+            sys.exit(1)
+    else:
+        print(json.dumps(request(args.socket, {"command": "ping" if args.command == "ping" else "shutdown"})))
+
+
+if __name__ == "__main__":
+    main()
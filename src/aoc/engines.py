@@ -0,0 +1,29 @@
+"""
+Engines for the days that have more than one implementation, picked with the
+``engine`` solver parameter:
+
+    python -m aoc 1 --param engine=numpy
+
+numpy is optional. It is imported here once, as ``np`` or None when it is
+missing, and ``check_engine`` refuses the numpy engine without it.
+"""
+from typing import Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+PYTHON = "python"
+NUMPY = "numpy"
+
+
+def check_engine(engine: str, engines: Sequence[str]):
+    """
+    Fail early on an engine the day doesn't have, or that can't run here.
+    """
+    if engine not in engines:
+        raise ValueError(f"Unknown engine '{engine}', expected one of {', '.join(engines)}")
+    if engine == NUMPY and np is None:
+        raise ImportError("The numpy engine needs numpy installed")
@@ -0,0 +1,123 @@
+"""
+Sorting integer streams that don't fit in memory.
+
+Values are collected in runs of at most ``run_size``, every full run is sorted
+and spilled to a temporary file of raw int64, and the runs are read back in
+blocks and merged lazily with ``heapq.merge``. At most ``MAX_FAN_IN`` runs are
+open at once: beyond that, groups of runs are first merged into longer runs,
+as many passes as needed:
+
+    with tempfile.TemporaryDirectory() as directory:
+        sorter = ExternalSorter(directory, memory_budget)
+        for value in values:
+            sorter.add(value)
+        for value in sorter.sorted():
+            ...
+"""
+import heapq
+import os
+from array import array
+from itertools import groupby
+from typing import Iterable, Iterator
+
+
+# A value waiting in a run costs its slot in the buffer, then a list slot and an int object while sorted
+BYTES_PER_VALUE = 8 + 8 + 32
+ITEM_SIZE = array("q").itemsize
+# Runs merged at once, so that a sorter keeps a bounded number of files open however many rows there are
+MAX_FAN_IN = 64
+
+
+def run_values(path: str, block_size: int) -> Iterator[int]:
+    """
+    The values of a spilled run, read ``block_size`` at a time.
+    """
+    with open(path, "rb") as fin:
+        while True:
+            block = array("q")
+            try:
+                block.fromfile(fin, block_size)
+            except EOFError:
+                # Whatever was left has still been read into the block
+                pass
+            if len(block) == 0:
+                return
+            yield from block
+
+
+class ExternalSorter:
+    def __init__(self, directory: str, memory_budget: int):
+        """
+        Keep the values being sorted within about ``memory_budget`` bytes, spilling runs to ``directory``.
+        """
+        self.directory = directory
+        self.memory_budget = memory_budget
+        self.run_size = max(1, memory_budget // BYTES_PER_VALUE)
+        self.buffer = array("q")
+        self.runs: list[str] = []
+        self.run_count = 0
+
+    def add(self, value: int):
+        self.buffer.append(value)
+        if len(self.buffer) >= self.run_size:
+            self._spill()
+
+    def extend(self, values: Iterable[int]):
+        for value in values:
+            self.add(value)
+
+    def _run_path(self) -> str:
+        self.run_count += 1
+        return os.path.join(self.directory, f"run-{id(self)}-{self.run_count}.bin")
+
+    def _spill(self):
+        path = self._run_path()
+        with open(path, "wb") as fout:
+            array("q", sorted(self.buffer)).tofile(fout)
+        self.runs.append(path)
+        self.buffer = array("q")
+
+    def _block_size(self, run_count: int) -> int:
+        return max(1, self.memory_budget // (ITEM_SIZE * run_count))
+
+    def _merge_runs(self, paths: list[str]) -> str:
+        """
+        Merge some runs into a new one and delete them.
+        """
+        # One block per merged run, plus one for the output
+        block_size = self._block_size(len(paths) + 1)
+        path = self._run_path()
+        with open(path, "wb") as fout:
+            block = array("q")
+            for value in heapq.merge(*(run_values(run, block_size) for run in paths)):
+                block.append(value)
+                if len(block) >= block_size:
+                    block.tofile(fout)
+                    block = array("q")
+            block.tofile(fout)
+        for run in paths:
+            os.remove(run)
+        return path
+
+    def sorted(self) -> Iterator[int]:
+        """
+        Every value added so far, in ascending order. Only an in-memory sort if nothing was spilled.
+        """
+        if len(self.runs) == 0:
+            return iter(sorted(self.buffer))
+        if len(self.buffer) > 0:
+            self._spill()
+        while len(self.runs) > MAX_FAN_IN:
+            self.runs = [self._merge_runs(self.runs[start:start + MAX_FAN_IN])
+                         for start in range(0, len(self.runs), MAX_FAN_IN)]
+        # The merge holds one block per run
+        block_size = self._block_size(len(self.runs))
+        return heapq.merge(*(run_values(path, block_size) for path in self.runs))
+
+
+def counts(sorted_values: Iterable[int]) -> Iterator[tuple[int, int]]:
+    """
+    ``(value, occurrences)`` of a sorted stream, in ascending order.
+    """
+    for value, group in groupby(sorted_values):
+        yield value, sum(1 for _ in group)
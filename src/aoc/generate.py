@@ -0,0 +1,531 @@
+"""
+Deterministic synthetic inputs for every day, at any scale:
+
+    python -m aoc.generate 12 --scale 10 --seed 1 -o /tmp/day_12_x10.txt
+    python -m aoc.generate 18 --scale 10 | python -m aoc 18 --input - --param size=700 --param byte_count=102400
+
+``scale`` multiplies the size of the real puzzle input along its natural
+dimension: the side of a map, or the length of a list (numbers, reports,
+equations, robots, designs...). The same day, scale and seed always produce the
+same input.
+
+Some solvers take parameters that have to follow the input size (the memory
+space of day 18, for instance). Those are returned with the input, and the CLI
+prints them as ``--param`` options on stderr.
+"""
+import argparse
+import math
+import random
+import string
+import sys
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from aoc.benchmark import day_name
+from aoc.grid import Grid
+from aoc.search import bfs
+
+
+@dataclass
+class GeneratedInput:
+    raw: str
+    # Solver parameters matching the generated input, see python -m aoc --param
+    params: dict = field(default_factory=dict)
+
+
+Generator = Callable[[random.Random, float], GeneratedInput]
+
+GENERATORS: dict[str, Generator] = {}
+
+
+def generator(day: int):
+    def decorator(func: Generator) -> Generator:
+        GENERATORS[day_name(day)] = func
+        return func
+    return decorator
+
+
+def generate(day, scale: float = 1.0, seed: int = 0) -> GeneratedInput:
+    name = day_name(day)
+    if name not in GENERATORS:
+        raise ValueError(f"No generator for {name}. Available: {', '.join(GENERATORS)}")
+    if scale <= 0:
+        raise ValueError(f"Scale must be positive, got {scale}")
+    # Seeded per day so that the days don't share a random stream
+    return GENERATORS[name](random.Random(f"{name}:{seed}"), scale)
+
+
+def scaled(base: int, scale: float, minimum: int = 1) -> int:
+    return max(minimum, round(base * scale))
+
+
+def lines(rows) -> str:
+    return "\n".join(rows) + "\n"
+
+
+def maze(rng: random.Random, width: int, height: int) -> Grid:
+    """
+    Perfect maze (exactly one path between any two open cells) carved by a depth-first search.
+    Open cells are at odd coordinates, so both sides should be odd.
+    """
+    grid = Grid(width, height, fill=b"#")
+    grid[grid.index(1, 1)] = "."
+    stack = [(1, 1)]
+    while len(stack) > 0:
+        x, y = stack[-1]
+        candidates = [(x + dx, y + dy) for dx, dy in ((-2, 0), (2, 0), (0, -2), (0, 2))
+                      if 0 < x + dx < width - 1 and 0 < y + dy < height - 1 and grid.get(x + dx, y + dy) == "#"]
+        if len(candidates) == 0:
+            stack.pop()
+            continue
+        target_x, target_y = rng.choice(candidates)
+        grid[grid.index((x + target_x) // 2, (y + target_y) // 2)] = "."
+        grid[grid.index(target_x, target_y)] = "."
+        stack.append((target_x, target_y))
+    return grid
+
+
+def odd(value: int) -> int:
+    return value if value % 2 == 1 else value + 1
+
+
+@generator(1)
+def day_1(rng: random.Random, scale: float) -> GeneratedInput:
+    count = scaled(1000, scale)
+    firsts = [rng.randint(10000, 99999) for _ in range(count)]
+    # Part 2 needs numbers of the left list to show up in the right one
+    seconds = [rng.choice(firsts) if rng.random() < 0.3 else rng.randint(10000, 99999) for _ in range(count)]
+    return GeneratedInput(lines(f"{first}   {second}" for first, second in zip(firsts, seconds)))
+
+
+@generator(2)
+def day_2(rng: random.Random, scale: float) -> GeneratedInput:
+    reports = []
+    for _ in range(scaled(1000, scale)):
+        length = rng.randint(5, 8)
+        step_sign = rng.choice((-1, 1))
+        levels = [rng.randint(30, 60)]
+        for _ in range(length - 1):
+            levels.append(levels[-1] + step_sign * rng.randint(1, 3))
+        kind = rng.random()
+        if kind < 0.35:
+            # One bad level, mostly fixable by removing it
+            levels[rng.randrange(length)] = rng.randint(1, 99)
+        elif kind < 0.5:
+            levels[rng.randrange(length)] = levels[rng.randrange(length)]
+        elif kind < 0.7:
+            levels = [rng.randint(1, 99) for _ in range(length)]
+        reports.append(" ".join(map(str, levels)))
+    return GeneratedInput(lines(reports))
+
+
+@generator(3)
+def day_3(rng: random.Random, scale: float) -> GeneratedInput:
+    junk = "!@#$%^&*()_+-=[]{};:'\",.<>/?~ "
+    words = ("what()", "from()", "who()", "select()", "where()", "when()", "how()", "why()")
+
+    def token() -> str:
+        kind = rng.random()
+        a, b = rng.randint(1, 999), rng.randint(1, 999)
+        if kind < 0.3:
+            return f"mul({a},{b})"
+        if kind < 0.4:
+            return rng.choice((f"mul({a},{b}]", f"mul[{a},{b})", f"mul ( {a},{b})", f"mul({a}, {b})",
+                               f"mul({a},{b}!", f"mul({a}{b})", f"mul({a},{b * 1000})"))
+        if kind < 0.45:
+            return "do()"
+        if kind < 0.5:
+            return "don't()"
+        if kind < 0.6:
+            return rng.choice(words)
+        return "".join(rng.choice(junk) for _ in range(rng.randint(1, 4)))
+
+    rows = []
+    for _ in range(scaled(6, scale)):
+        row = []
+        length = 0
+        while length < 2800:
+            row.append(token())
+            length += len(row[-1])
+        rows.append("".join(row))
+    return GeneratedInput(lines(rows))
+
+
+@generator(4)
+def day_4(rng: random.Random, scale: float) -> GeneratedInput:
+    side = scaled(140, scale, 4)
+    return GeneratedInput(lines("".join(rng.choice("XMAS") for _ in range(side)) for _ in range(side)))
+
+
+@generator(5)
+def day_5(rng: random.Random, scale: float) -> GeneratedInput:
+    """
+    Pages sit on a circle and every page comes before the next half of the circle, like the real input:
+    the rules as a whole are cyclic, but any update taken from half of the circle has a consistent order.
+    The number of rules grows with the square of the number of pages, so pages grow with the square root
+    of the scale, and updates grow linearly.
+    """
+    page_count = odd(scaled(49, math.sqrt(scale), 7))
+    pages = rng.sample(range(10, max(100, 10 * page_count)), page_count)
+    rules = [(pages[i], pages[(i + offset) % page_count])
+             for i in range(page_count) for offset in range(1, page_count // 2 + 1)]
+    rng.shuffle(rules)
+    window = page_count // 2 + 1
+    updates = []
+    for _ in range(scaled(200, scale)):
+        start = rng.randrange(page_count)
+        length = rng.randrange(3, min(23, window) + 1, 2)
+        offsets = sorted(rng.sample(range(window), length))
+        update = [pages[(start + offset) % page_count] for offset in offsets]
+        if rng.random() < 0.5:
+            rng.shuffle(update)
+        updates.append(",".join(map(str, update)))
+    return GeneratedInput(lines(f"{before}|{after}" for before, after in rules) + "\n" + lines(updates))
+
+
+@generator(6)
+def day_6(rng: random.Random, scale: float) -> GeneratedInput:
+    side = scaled(130, scale, 4)
+    # Part 1 assumes the guard walks off the map, and a guard that leaves after a few steps makes a poor
+    # benchmark, so start the guard wherever the patrol is the longest among a few tries
+    while True:
+        grid = Grid(side, side)
+        for index in range(len(grid)):
+            if rng.random() < 0.048:
+                grid[index] = "#"
+        starts = [start for start in (rng.randrange(len(grid)) for _ in range(20)) if grid[start] == "."]
+        lengths = [_patrol_length(grid, start) for start in starts]
+        if len(lengths) > 0 and max(lengths) > 0:
+            grid[starts[lengths.index(max(lengths))]] = "^"
+            return GeneratedInput(str(grid) + "\n")
+
+
+def _patrol_length(grid: Grid, start: int) -> int:
+    """
+    Number of cells the guard visits before leaving the map, 0 if they end up in a loop.
+    """
+    # Up, right, down, left: turning right is the next direction
+    directions = (-grid.width, 1, grid.width, -1)
+    seen = bytearray(len(grid) * 4)
+    position, direction_index = start, 0
+    while True:
+        state = position * 4 + direction_index
+        if seen[state]:
+            return 0
+        seen[state] = True
+        next_position = grid.step(position, directions[direction_index])
+        if next_position == -1:
+            return sum(any(seen[cell * 4:cell * 4 + 4]) for cell in range(len(grid)))
+        if grid[next_position] == "#":
+            direction_index = (direction_index + 1) % 4
+        else:
+            position = next_position
+
+
+@generator(7)
+def day_7(rng: random.Random, scale: float) -> GeneratedInput:
+    equations = []
+    # The solver keys equations by result, like the real input no two of them share one
+    seen = set()
+    while len(equations) < scaled(850, scale):
+        numbers = [rng.randint(1, 9) if rng.random() < 0.6 else rng.randint(10, 999)
+                   for _ in range(rng.randint(2, 12))]
+        result = numbers[0]
+        for number in numbers[1:]:
+            operator = rng.choice("+*|")
+            # Keep results in the range of the real input
+            if operator == "|" and result < 10 ** 12:
+                result = int(f"{result}{number}")
+            elif operator == "*" and result * number < 10 ** 15:
+                result *= number
+            else:
+                result += number
+        if rng.random() < 0.4:
+            # Most likely unreachable
+            result += rng.randint(1, 100)
+        if result in seen:
+            continue
+        seen.add(result)
+        equations.append(f"{result}: {' '.join(map(str, numbers))}")
+    return GeneratedInput(lines(equations))
+
+
+@generator(8)
+def day_8(rng: random.Random, scale: float) -> GeneratedInput:
+    side = scaled(50, scale, 4)
+    grid = Grid(side, side)
+    frequencies = string.digits + string.ascii_letters
+    antenna_count = min(scaled(188, scale ** 2), len(grid))
+    for index, frequency in zip(rng.sample(range(len(grid)), antenna_count),
+                                (rng.choice(frequencies) for _ in range(antenna_count))):
+        grid[index] = frequency
+    return GeneratedInput(str(grid) + "\n")
+
+
+@generator(9)
+def day_9(rng: random.Random, scale: float) -> GeneratedInput:
+    length = odd(scaled(19999, scale))
+    # Files have at least one block, free spaces can be empty
+    return GeneratedInput("".join(str(rng.randint(1, 9) if i % 2 == 0 else rng.randint(0, 9))
+                                  for i in range(length)) + "\n")
+
+
+@generator(10)
+def day_10(rng: random.Random, scale: float) -> GeneratedInput:
+    side = scaled(54, scale, 4)
+    grid = Grid(side, side, bytearray(rng.choice(b"0123456789") for _ in range(side * side)))
+    # Random digits hardly make any trail, so carve climbing walks over them without crossing earlier ones
+    carved = bytearray(len(grid))
+    for _ in range(len(grid) // 10):
+        position = rng.randrange(len(grid))
+        if carved[position]:
+            continue
+        for height in b"0123456789":
+            carved[position] = True
+            grid.cells[position] = height
+            candidates = [neighbour for neighbour in grid.neighbours(position) if not carved[neighbour]]
+            if len(candidates) == 0:
+                break
+            position = rng.choice(candidates)
+    return GeneratedInput(str(grid) + "\n")
+
+
+@generator(11)
+def day_11(rng: random.Random, scale: float) -> GeneratedInput:
+    stones = [rng.choice((0, 1, rng.randint(2, 99), rng.randint(100, 10 ** 7))) for _ in range(scaled(8, scale))]
+    return GeneratedInput(" ".join(map(str, stones)) + "\n")
+
+
+@generator(12)
+def day_12(rng: random.Random, scale: float) -> GeneratedInput:
+    side = scaled(140, scale, 4)
+    grid = Grid(side, side)
+    cells = grid.cells
+    plants = string.ascii_uppercase.encode()
+    # Mostly copy the plant above or on the left, which grows irregular regions
+    for index in range(len(grid)):
+        x, y = grid.position(index)
+        roll = rng.random()
+        if roll < 0.45 and x > 0:
+            cells[index] = cells[index - 1]
+        elif roll < 0.9 and y > 0:
+            cells[index] = cells[index - side]
+        else:
+            cells[index] = rng.choice(plants)
+    return GeneratedInput(str(grid) + "\n")
+
+
+@generator(13)
+def day_13(rng: random.Random, scale: float) -> GeneratedInput:
+    machines = []
+    for _ in range(scaled(320, scale)):
+        a_x, a_y, b_x, b_y = (rng.randint(10, 99) for _ in range(4))
+        # Collinear buttons have no single solution, the solver divides by the determinant
+        while a_x * b_y == a_y * b_x:
+            b_x, b_y = rng.randint(10, 99), rng.randint(10, 99)
+        if rng.random() < 0.5:
+            presses_a, presses_b = rng.randint(0, 100), rng.randint(0, 100)
+            prize_x, prize_y = a_x * presses_a + b_x * presses_b, a_y * presses_a + b_y * presses_b
+        else:
+            prize_x, prize_y = rng.randint(1000, 20000), rng.randint(1000, 20000)
+        machines.append(f"Button A: X+{a_x}, Y+{a_y}\nButton B: X+{b_x}, Y+{b_y}\nPrize: X={prize_x}, Y={prize_y}\n")
+    return GeneratedInput("\n".join(machines))
+
+
+@generator(14)
+def day_14(rng: random.Random, scale: float) -> GeneratedInput:
+    # The room size is a solver parameter, only the number of robots grows
+    robots = [f"p={rng.randrange(101)},{rng.randrange(103)} v={rng.randint(-99, 99)},{rng.randint(-99, 99)}"
+              for _ in range(scaled(500, scale))]
+    return GeneratedInput(lines(robots))
+
+
+@generator(15)
+def day_15(rng: random.Random, scale: float) -> GeneratedInput:
+    side = scaled(50, scale, 5)
+    grid = Grid(side, side, fill=b"#")
+    for y in range(1, side - 1):
+        for x in range(1, side - 1):
+            roll = rng.random()
+            grid[grid.index(x, y)] = "#" if roll < 0.05 else "O" if roll < 0.3 else "."
+    grid[grid.index(side // 2, side // 2)] = "@"
+    moves = "".join(rng.choice("<>^v") for _ in range(scaled(20000, scale)))
+    return GeneratedInput(str(grid) + "\n\n" + lines(moves[i:i + 1000] for i in range(0, len(moves), 1000)))
+
+
+@generator(16)
+def day_16(rng: random.Random, scale: float) -> GeneratedInput:
+    side = odd(scaled(141, scale, 5))
+    grid = maze(rng, side, side)
+    # The real maze has loops: knock down some walls between two corridors
+    for y in range(1, side - 1):
+        for x in range(1, side - 1):
+            if (x + y) % 2 == 1 and rng.random() < 0.1:
+                index = grid.index(x, y)
+                if grid[index - 1] == grid[index + 1] == "." or grid[index - side] == grid[index + side] == ".":
+                    grid[index] = "."
+    grid[grid.index(1, side - 2)] = "S"
+    grid[grid.index(side - 2, 1)] = "E"
+    return GeneratedInput(str(grid) + "\n")
+
+
+def _program_output(program: list[int], register_a: int) -> list[int]:
+    registers = [register_a, 0, 0]
+    pointer = 0
+    output = []
+    while pointer < len(program):
+        opcode, operand = program[pointer], program[pointer + 1]
+        # Operand 7 is only valid as a literal
+        combo = operand if operand <= 3 or operand == 7 else registers[operand - 4]
+        pointer += 2
+        if opcode in (0, 6, 7):
+            registers[0 if opcode == 0 else opcode - 5] = registers[0] >> combo
+        elif opcode == 1:
+            registers[1] ^= operand
+        elif opcode == 2:
+            registers[1] = combo % 8
+        elif opcode == 3 and registers[0] != 0:
+            pointer = operand
+        elif opcode == 4:
+            registers[1] ^= registers[2]
+        elif opcode == 5:
+            output.append(combo % 8)
+    return output
+
+
+def _has_quine(program: list[int], budget: int = 100_000) -> bool:
+    """
+    Whether some register A makes the program output itself, searched 3 bits at a time like day 17 part 2.
+    """
+    stack = list(range(1, 8))
+    while len(stack) > 0 and budget > 0:
+        budget -= 1
+        register_a = stack.pop()
+        output = _program_output(program, register_a)
+        if output == program[-len(output):]:
+            if len(output) == len(program):
+                return True
+            stack.extend(range(register_a * 8, register_a * 8 + 8))
+    return False
+
+
+@generator(17)
+def day_17(rng: random.Random, scale: float) -> GeneratedInput:
+    """
+    The same shape of program as the real input with different constants. It outputs one digit per
+    3 bits of register A, so the scale multiplies the number of bits of A.
+
+    Constants are drawn again until part 2 has a solution, and until A = 0 doesn't output the last digit of
+    the program, which would have part 2 extend it forever.
+    """
+    while True:
+        shift_and_mix = [[0, 3], [1, rng.randrange(8)]]
+        rng.shuffle(shift_and_mix)
+        program = [2, 4, 1, rng.randrange(8), 7, 5, *shift_and_mix[0], *shift_and_mix[1], 4, rng.randrange(8),
+                   5, 5, 3, 0]
+        if _program_output(program, 0) != program[-1:] and _has_quine(program):
+            break
+    register_a = rng.getrandbits(scaled(3 * len(program), scale, 3)) | 1
+    return GeneratedInput(f"Register A: {register_a}\nRegister B: 0\nRegister C: 0\n\n"
+                          f"Program: {','.join(map(str, program))}\n")
+
+
+@generator(18)
+def day_18(rng: random.Random, scale: float) -> GeneratedInput:
+    size = scaled(70, scale, 6)
+    side = size + 1
+    start, end = 0, side * side - 1
+    cells = [index for index in range(side * side) if index not in (start, end)]
+    byte_count = round(1024 * side * side / 5041)
+    # Part 1 needs a path after the first bytes have fallen
+    rng.shuffle(cells)
+    while not _exit_reachable(side, cells[:byte_count]):
+        rng.shuffle(cells)
+    # Part 2 needs the exit to be cut off by the end of the list
+    wall_count = round(len(cells) * 3450 / 5039)
+    if _exit_reachable(side, cells[:wall_count]):
+        wall_count = len(cells)
+    walls = [f"{index % side},{index // side}" for index in cells[:wall_count]]
+    return GeneratedInput(lines(walls), {"size": size, "byte_count": byte_count})
+
+
+def _exit_reachable(side: int, walls: list[int]) -> bool:
+    """
+    Whether the bottom right corner can be reached from the top left one, around the given walls.
+    """
+    grid = Grid(side, side)
+    for index in walls:
+        grid[index] = "#"
+    end = len(grid) - 1
+    reachable = bfs(len(grid), [0], lambda index: (neighbour for neighbour in grid.neighbours(index)
+                                                   if grid[neighbour] != "#"), targets=[end])
+    return reachable.reached(end)
+
+
+@generator(19)
+def day_19(rng: random.Random, scale: float) -> GeneratedInput:
+    # No single "r" towel, so that some designs are impossible
+    towels = {"w", "u", "b", "g"}
+    while len(towels) < 447:
+        towels.add("".join(rng.choice("wubrg") for _ in range(rng.randint(2, 8))))
+    towels = sorted(towels)
+    rng.shuffle(towels)
+    designs = []
+    for _ in range(scaled(400, scale)):
+        length = rng.randint(40, 60)
+        if rng.random() < 0.7:
+            design = ""
+            while len(design) < length:
+                design += rng.choice(towels)
+        else:
+            design = "".join(rng.choice("wubrg") for _ in range(length))
+        designs.append(design)
+    return GeneratedInput(", ".join(towels) + "\n\n" + lines(designs))
+
+
+@generator(20)
+def day_20(rng: random.Random, scale: float) -> GeneratedInput:
+    """
+    A single track without branches: the longest corridor of a perfect maze, everything else is wall.
+    """
+    side = odd(scaled(141, scale, 5))
+    grid = maze(rng, side, side)
+    free = lambda index: (neighbour for neighbour in grid.neighbours(index) if grid[neighbour] != "#")
+    # The farthest cell from anywhere is one end of the longest path, the farthest cell from it is the other
+    first = bfs(len(grid), [grid.index(1, 1)], free)
+    start = max(range(len(grid)), key=lambda index: first.distances[index] if first.reached(index) else -1)
+    second = bfs(len(grid), [start], free)
+    end = max(range(len(grid)), key=lambda index: second.distances[index] if second.reached(index) else -1)
+    track = Grid(side, side, fill=b"#")
+    for index in second.path(end):
+        track[index] = "."
+    track[start] = "S"
+    track[end] = "E"
+    return GeneratedInput(str(track) + "\n")
+
+
+@generator(21)
+def day_21(rng: random.Random, scale: float) -> GeneratedInput:
+    return GeneratedInput(lines(f"{rng.randrange(1000):03d}A" for _ in range(scaled(5, scale))))
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic input for a day.")
+    parser.add_argument("day", help="Day to generate for, e.g. 7 or day_7")
+    parser.add_argument("--scale", type=float, default=1.0, help="Size relative to the real input")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", "-o", help="Write the input to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    generated = generate(args.day, args.scale, args.seed)
+    if args.output:
+        with open(args.output, "w") as fout:
+            fout.write(generated.raw)
+    else:
+        sys.stdout.write(generated.raw)
+    if generated.params:
+        print(" ".join(f"--param {key}={value}" for key, value in generated.params.items()), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
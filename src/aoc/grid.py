@@ -0,0 +1,104 @@
+"""
+Character map stored row-major in a flat ``bytearray``, one byte per cell.
+
+Cells are addressed by an integer index ``y * width + x`` so that hot loops can
+move around with plain integer offsets instead of allocating ``(x, y)`` tuples:
+
+    grid = Grid.parse(raw)
+    start = grid.find("S")
+    for neighbour in grid.neighbours(start):
+        if grid.cells[neighbour] != ord("#"):
+            ...
+"""
+from typing import Iterator, Optional
+
+
+CoordinatePair = tuple[int, int]
+
+
+class Grid:
+    def __init__(self, width: int, height: int, cells: Optional[bytearray] = None, fill: bytes = b"."):
+        if cells is None:
+            cells = bytearray(fill * (width * height))
+        if len(cells) != width * height:
+            raise ValueError(f"Expected {width * height} cells for a {width}x{height} grid, got {len(cells)}")
+        self.width = width
+        self.height = height
+        self.cells = cells
+        # Left, right, up, down
+        self.offsets = (-1, 1, -width, width)
+
+    @classmethod
+    def parse(cls, raw: str) -> "Grid":
+        lines = [line.strip() for line in raw.strip().splitlines()]
+        width = len(lines[0])
+        if any(len(line) != width for line in lines):
+            raise ValueError("All rows of a grid must have the same length")
+        return cls(width, len(lines), bytearray("".join(lines), "ascii"))
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __getitem__(self, index: int) -> str:
+        return chr(self.cells[index])
+
+    def __setitem__(self, index: int, char: str):
+        self.cells[index] = ord(char)
+
+    def copy(self) -> "Grid":
+        return Grid(self.width, self.height, self.cells.copy())
+
+    def index(self, x: int, y: int) -> int:
+        return y * self.width + x
+
+    def position(self, index: int) -> CoordinatePair:
+        y, x = divmod(index, self.width)
+        return x, y
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def get(self, x: int, y: int, default: Optional[str] = None) -> Optional[str]:
+        if not self.in_bounds(x, y):
+            return default
+        return chr(self.cells[y * self.width + x])
+
+    def step(self, index: int, offset: int) -> int:
+        """
+        ``index + offset`` if that stays on the grid (and on the same row for horizontal moves), otherwise -1.
+        """
+        if offset == 1:
+            return index + 1 if (index + 1) % self.width != 0 else -1
+        if offset == -1:
+            return index - 1 if index % self.width != 0 else -1
+        new_index = index + offset
+        return new_index if 0 <= new_index < len(self.cells) else -1
+
+    def neighbours(self, index: int) -> Iterator[int]:
+        """
+        The orthogonal neighbours of a cell that are on the grid.
+        """
+        width = self.width
+        x = index % width
+        if x > 0:
+            yield index - 1
+        if x < width - 1:
+            yield index + 1
+        if index >= width:
+            yield index - width
+        if index + width < len(self.cells):
+            yield index + width
+
+    def find(self, char: str) -> int:
+        return self.cells.find(ord(char))
+
+    def find_all(self, char: str) -> list[int]:
+        indexes = []
+        index = self.cells.find(ord(char))
+        while index != -1:
+            indexes.append(index)
+            index = self.cells.find(ord(char), index + 1)
+        return indexes
+
+    def __str__(self):
+        return "\n".join(self.cells[y * self.width:(y + 1) * self.width].decode("ascii") for y in range(self.height))
@@ -0,0 +1,97 @@
+from typing import Generic, Hashable, TypeVar
+
+
+T = TypeVar("T", bound=Hashable)
+
+
+class PriorityQueue(Generic[T]):
+    """
+    Min-priority queue on a binary heap, with an item -> heap slot index so that an item
+    can be looked up and have its priority changed in O(log n).
+
+    Every item is in the queue at most once: pushing an item that is already queued
+    updates its priority instead of adding a duplicate.
+    """
+
+    def __init__(self):
+        self._heap: list[tuple[float, T]] = []
+        self._slots: dict[T, int] = {}
+        self._item_to_priority: dict[T, float] = {}
+
+    def push(self, item: T, priority: float):
+        if item in self._slots:
+            self.update_priority(item, priority)
+            return
+        self._heap.append((priority, item))
+        self._slots[item] = len(self._heap) - 1
+        self._item_to_priority[item] = priority
+        self._sift_up(len(self._heap) - 1)
+
+    def pop(self) -> tuple[float, T]:
+        if len(self._heap) == 0:
+            raise IndexError("pop from an empty priority queue")
+        self._swap(0, len(self._heap) - 1)
+        priority, item = self._heap.pop()
+        del self._slots[item]
+        if len(self._heap) > 0:
+            self._sift_down(0)
+        return priority, item
+
+    def peek(self) -> tuple[float, T]:
+        return self._heap[0]
+
+    def update_priority(self, item: T, priority: float):
+        if item not in self._slots:
+            self.push(item, priority)
+            return
+        slot = self._slots[item]
+        old_priority, _ = self._heap[slot]
+        self._heap[slot] = (priority, item)
+        self._item_to_priority[item] = priority
+        if priority < old_priority:
+            self._sift_up(slot)
+        else:
+            self._sift_down(slot)
+
+    def get_priority(self, item: T) -> float:
+        """
+        The last priority the item was queued with, even if it was popped since.
+        """
+        return self._item_to_priority.get(item, float("inf"))
+
+    def __contains__(self, item: T) -> bool:
+        return item in self._slots
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __repr__(self):
+        return f"Queue({sorted(self._heap, key=lambda entry: entry[0])})"
+
+    def _swap(self, slot_1: int, slot_2: int):
+        heap = self._heap
+        heap[slot_1], heap[slot_2] = heap[slot_2], heap[slot_1]
+        self._slots[heap[slot_1][1]] = slot_1
+        self._slots[heap[slot_2][1]] = slot_2
+
+    def _sift_up(self, slot: int):
+        heap = self._heap
+        while slot > 0:
+            parent = (slot - 1) // 2
+            if heap[parent][0] <= heap[slot][0]:
+                break
+            self._swap(slot, parent)
+            slot = parent
+
+    def _sift_down(self, slot: int):
+        heap = self._heap
+        size = len(heap)
+        while True:
+            smallest = slot
+            for child in (2 * slot + 1, 2 * slot + 2):
+                if child < size and heap[child][0] < heap[smallest][0]:
+                    smallest = child
+            if smallest == slot:
+                break
+            self._swap(slot, smallest)
+            slot = smallest
@@ -0,0 +1,141 @@
+"""
+Opt-in profiling of solver runs, switched on with the ``AOC_PROFILE`` environment
+variable or the ``--profile`` flag of ``python -m aoc`` and ``python -m aoc.scheduler``:
+
+    AOC_PROFILE=1 python src/day_15/main.py
+    python -m aoc 16 --profile --profile-top 15
+    python -m pstats profiles/day_16.part2.prof
+
+Every ``@timed`` solver call (and every solve of the runner) is then run under
+cProfile, and the stats are written to ``<dir>/<day>.<part>.prof``. The
+directory is ``profiles`` in the working directory, or the value of
+``AOC_PROFILE`` when it is a path. The report also has the tracemalloc peak of
+the call, the peak RSS of the process so far and the ``AOC_PROFILE_TOP`` (10 by
+default) functions with the most time spent in their own code.
+
+Profiling slows solvers down a lot, so timings taken under it are only good for
+finding hotspots.
+"""
+import cProfile
+import io
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+PROFILE_ENV = "AOC_PROFILE"
+TOP_ENV = "AOC_PROFILE_TOP"
+DEFAULT_DIR = "profiles"
+DEFAULT_TOP = 10
+
+
+@dataclass
+class HotFunction:
+    function: str
+    calls: int
+    own_seconds: float
+    cumulative_seconds: float
+
+    def __str__(self):
+        return f"{self.own_seconds:10.6f}s {self.cumulative_seconds:10.6f}s {self.calls:>10}  {self.function}"
+
+
+@dataclass
+class ProfileReport:
+    name: str
+    seconds: float
+    prof_file: Optional[str]
+    tracemalloc_peak: int
+    peak_rss: Optional[int]
+    hot_functions: list[HotFunction] = field(default_factory=list)
+
+    def __str__(self):
+        rss = f"{self.peak_rss / 2 ** 20:.1f} MiB" if self.peak_rss is not None else "unknown"
+        lines = [
+            f"Profile of '{self.name}': {self.seconds:.6f}s under the profiler, "
+            f"tracemalloc peak {self.tracemalloc_peak / 2 ** 20:.2f} MiB, process peak RSS {rss}",
+            f"Stats written to {self.prof_file}",
+            f"{'own':>11} {'cumulative':>11} {'calls':>10}  function",
+        ]
+        lines.extend(str(hot_function) for hot_function in self.hot_functions)
+        return "\n".join(lines)
+
+
+def profiling_enabled() -> bool:
+    return os.environ.get(PROFILE_ENV, "0") not in ("", "0")
+
+
+def enable_profiling(directory: Optional[str] = None, top: Optional[int] = None):
+    """
+    Turn profiling on for this process and the processes it starts.
+    """
+    os.environ[PROFILE_ENV] = directory or DEFAULT_DIR
+    if top is not None:
+        os.environ[TOP_ENV] = str(top)
+
+
+def profile_dir() -> Path:
+    value = os.environ.get(PROFILE_ENV, "1")
+    return Path(DEFAULT_DIR if value == "1" else value)
+
+
+def top_count() -> int:
+    return int(os.environ.get(TOP_ENV, DEFAULT_TOP))
+
+
+def peak_rss() -> Optional[int]:
+    """
+    Peak resident set size of this process in bytes, None where the platform can't tell.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def hot_functions(profile: cProfile.Profile, count: int) -> list[HotFunction]:
+    stats = pstats.Stats(profile, stream=io.StringIO())
+    entries = []
+    for (filename, line, function), (_, calls, own, cumulative, _) in stats.stats.items():
+        location = f"{Path(filename).parent.name}/{Path(filename).name}:{line}" if line else filename
+        entries.append(HotFunction(f"{function} ({location})", calls, own, cumulative))
+    entries.sort(key=lambda entry: entry.own_seconds, reverse=True)
+    return entries[:count]
+
+
+def run_profiled(name: str, func: Callable, *args, **kwargs) -> tuple[Any, ProfileReport]:
+    """
+    Call ``func`` under cProfile and tracemalloc. ``name`` is used for the ``.prof`` file, e.g. ``day_16.part2``.
+    """
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    profile = cProfile.Profile()
+    start_time = time.perf_counter()
+    try:
+        result = profile.runcall(func, *args, **kwargs)
+    finally:
+        end_time = time.perf_counter()
+        _, tracemalloc_peak = tracemalloc.get_traced_memory()
+        if started_tracing:
+            tracemalloc.stop()
+
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    prof_file = directory / f"{name}.prof"
+    profile.dump_stats(prof_file)
+    report = ProfileReport(name, end_time - start_time, str(prof_file), tracemalloc_peak, peak_rss(),
+                           hot_functions(profile, top_count()))
+    return result, report
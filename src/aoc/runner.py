@@ -0,0 +1,139 @@
+"""
+Run any day's solvers on explicit inputs from one warm process:
+
+    python -m aoc 11 --part part2_fast --input input.txt --input other.txt --param blinks=40
+    python -m aoc 18 --input day_18/input_small.txt --param size=6 --param byte_count=12
+    cat input.txt | python -m aoc 3 --input -
+
+Without ``--input`` the day's own ``input.txt`` is used. Parameters are passed as
+keyword arguments to the solvers that accept them (see each solver's signature).
+``--profile`` runs every solve under cProfile and tracemalloc, see ``aoc.profiling``.
+"""
+import argparse
+import ast
+import contextlib
+import io
+import json
+import sys
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Optional
+
+from aoc.benchmark import day_name, default_input, get_solvers, load_day, solver_kwargs
+from aoc.profiling import ProfileReport, enable_profiling, profiling_enabled, run_profiled
+
+
+STDIN = "-"
+
+
+@dataclass
+class SolveResult:
+    day: str
+    part: str
+    input: str
+    result: Any
+    seconds: float
+    profile: Optional[ProfileReport] = None
+
+    def to_dict(self) -> dict:
+        result = self.result if isinstance(self.result, (int, float, str, type(None))) else repr(self.result)
+        return {**asdict(self), "result": result}
+
+    def __str__(self):
+        summary = f"{self.day} {self.part} [{self.input}]: {self.result} ({self.seconds:.6f}s)"
+        return summary if self.profile is None else f"{summary}\n{self.profile}"
+
+
+def read_input(path: str) -> str:
+    if path == STDIN:
+        return sys.stdin.read()
+    with open(path) as fin:
+        return fin.read()
+
+
+def parse_param(raw_param: str) -> tuple[str, Any]:
+    """
+    ``key=value`` where value is a Python literal, e.g. ``blinks=75`` or ``size=101,103``.
+    Anything that is not a literal is kept as a string.
+    """
+    key, separator, value = raw_param.partition("=")
+    if not separator:
+        raise argparse.ArgumentTypeError(f"Expected key=value, got '{raw_param}'")
+    try:
+        return key, ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return key, value
+
+
+def select_solvers(day, part_names: Optional[list[str]] = None) -> dict[str, Callable]:
+    solvers = get_solvers(load_day(day))
+    if not part_names:
+        return solvers
+    unknown = set(part_names) - set(solvers)
+    if unknown:
+        raise ValueError(f"Unknown parts for {day_name(day)}: {', '.join(sorted(unknown))}. "
+                         f"Available: {', '.join(solvers)}")
+    return {name: solvers[name] for name in part_names}
+
+
+def solve(day, part: str, raw: str, params: Optional[dict] = None, input_name: str = "<raw>",
+          quiet: bool = False) -> SolveResult:
+    solver = select_solvers(day, [part])[part]
+    kwargs = solver_kwargs(solver, params or {})
+    # Call the undecorated solver, the wall time is reported in the result instead
+    undecorated = getattr(solver, "__wrapped__", solver)
+    output = io.StringIO() if quiet else sys.stdout
+    profile = None
+    with contextlib.redirect_stdout(output):
+        start_time = time.perf_counter()
+        if profiling_enabled():
+            result, profile = run_profiled(f"{day_name(day)}.{part}", undecorated, raw, **kwargs)
+        else:
+            result = undecorated(raw, **kwargs)
+        end_time = time.perf_counter()
+    return SolveResult(day_name(day), part, input_name, result, end_time - start_time, profile)
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(prog="python -m aoc", description="Run solvers on explicit inputs.")
+    parser.add_argument("day", help="Day to run, e.g. 7 or day_7")
+    parser.add_argument("--part", "-p", action="append", dest="parts",
+                        help="Solver to run (repeatable), e.g. part1 or part2_prune. Defaults to all")
+    parser.add_argument("--input", "-i", action="append", dest="inputs",
+                        help=f"Input file (repeatable), '{STDIN}' for stdin. Defaults to the day's input.txt")
+    parser.add_argument("--input-list", help="File listing one input path per line")
+    parser.add_argument("--param", action="append", type=parse_param, default=[],
+                        help="Solver parameter as key=value (repeatable), e.g. blinks=75, size=70, depth=25")
+    parser.add_argument("--quiet", "-q", action="store_true", help="Silence the solvers' own output")
+    parser.add_argument("--json", action="store_true", help="Print one JSON object per result")
+    parser.add_argument("--profile", nargs="?", const="profiles", metavar="DIR",
+                        help="Profile every solve and write .prof files to DIR (default: profiles)")
+    parser.add_argument("--profile-top", type=int, metavar="N", help="Hot functions to list per profile")
+    args = parser.parse_args(argv)
+
+    if args.profile:
+        enable_profiling(args.profile, args.profile_top)
+
+    solvers = select_solvers(args.day, args.parts)
+    params = dict(args.param)
+    unused = set(params) - {key for solver in solvers.values() for key in solver_kwargs(solver, params)}
+    if unused:
+        parser.error(f"No selected part accepts: {', '.join(sorted(unused))}")
+
+    inputs = list(args.inputs or [])
+    if args.input_list:
+        inputs.extend(line.strip() for line in read_input(args.input_list).splitlines() if line.strip())
+    if len(inputs) == 0:
+        inputs.append(str(default_input(args.day)))
+    if inputs.count(STDIN) > 1:
+        parser.error("stdin can only be read once")
+
+    for input_name in inputs:
+        raw = read_input(input_name)
+        for part in solvers:
+            result = solve(args.day, part, raw, params, input_name, quiet=args.quiet or args.json)
+            print(json.dumps(result.to_dict()) if args.json else result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Run every day's solvers in parallel, one process per solver, with a wall-clock
+timeout per solver:
+
+    python -m aoc.scheduler --workers 8 --timeout 60 --json report.json
+    python -m aoc.scheduler 7 11 --timeout 5
+
+A solver that runs past its timeout is terminated and reported as ``timeout``
+without affecting the others. ``concurrent.futures.ProcessPoolExecutor`` cannot
+cancel a task that already started, hence the hand-rolled process slots.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+import traceback
+from dataclasses import dataclass, asdict
+from multiprocessing.connection import Connection, wait
+from typing import Any, Optional
+
+from aoc.benchmark import SRC_DIR, day_name, default_input
+from aoc.profiling import enable_profiling
+from aoc.runner import parse_param, read_input, select_solvers, solve
+
+
+OK = "ok"
+TIMEOUT = "timeout"
+ERROR = "error"
+
+
+@dataclass
+class Task:
+    day: str
+    part: str
+    input: str
+    params: dict
+    timeout: float
+
+
+@dataclass
+class TaskReport:
+    day: str
+    part: str
+    input: str
+    status: str
+    result: Any = None
+    seconds: Optional[float] = None
+    error: Optional[str] = None
+    # cProfile stats of the run, with --profile
+    prof_file: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        result = self.result if isinstance(self.result, (int, float, str, type(None))) else repr(self.result)
+        return {**asdict(self), "result": result}
+
+    def __str__(self):
+        if self.status == OK:
+            return f"{self.day} {self.part}: {self.result} ({self.seconds:.6f}s)"
+        if self.status == TIMEOUT:
+            return f"{self.day} {self.part}: TIMEOUT after {self.seconds:.1f}s"
+        return f"{self.day} {self.part}: ERROR {self.error.splitlines()[0]}"
+
+
+def all_days() -> list[str]:
+    days = [path.name for path in SRC_DIR.glob("day_*") if (path / "main.py").exists()]
+    return sorted(days, key=lambda day: int(day.removeprefix("day_")))
+
+
+def make_tasks(days: list[str], part_names: Optional[list[str]], params: dict, timeout: float,
+               input_name: Optional[str] = None) -> list[Task]:
+    tasks = []
+    for day in days:
+        solvers = select_solvers(day)
+        if part_names:
+            solvers = {name: solver for name, solver in solvers.items() if name in part_names}
+        for part in solvers:
+            tasks.append(Task(day_name(day), part, input_name or str(default_input(day)), params, timeout))
+    return tasks
+
+
+def _run_task(task: Task, connection: Connection):
+    try:
+        solved = solve(task.day, task.part, read_input(task.input), task.params, task.input, quiet=True)
+        connection.send(TaskReport(task.day, task.part, task.input, OK, solved.result, solved.seconds,
+                                   prof_file=solved.profile.prof_file if solved.profile else None))
+    except Exception as e:
+        connection.send(TaskReport(task.day, task.part, task.input, ERROR,
+                                   error=f"{type(e).__name__}: {e}\n{traceback.format_exc()}"))
+    finally:
+        connection.close()
+
+
+def run_tasks(tasks: list[Task], workers: Optional[int] = None, verbose: bool = True) -> list[TaskReport]:
+    workers = workers or os.cpu_count() or 1
+    pending = list(reversed(tasks))
+    # sentinel -> (task, process, receiving end, deadline)
+    running: dict[int, tuple[Task, multiprocessing.Process, Connection, float]] = {}
+    reports: list[TaskReport] = []
+
+    def finish(report: TaskReport):
+        reports.append(report)
+        if verbose:
+            print(report, flush=True)
+
+    while len(pending) > 0 or len(running) > 0:
+        while len(pending) > 0 and len(running) < workers:
+            task = pending.pop()
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(target=_run_task, args=(task, sender), daemon=True)
+            process.start()
+            sender.close()
+            running[process.sentinel] = (task, process, receiver, time.monotonic() + task.timeout)
+
+        next_deadline = min(deadline for *_, deadline in running.values())
+        for sentinel in wait(list(running), timeout=max(next_deadline - time.monotonic(), 0)):
+            task, process, receiver, _ = running.pop(sentinel)
+            try:
+                finish(receiver.recv())
+            except EOFError:
+                finish(TaskReport(task.day, task.part, task.input, ERROR,
+                                  error=f"Process exited with code {process.exitcode}"))
+            process.join()
+            receiver.close()
+
+        now = time.monotonic()
+        for sentinel, (task, process, receiver, deadline) in list(running.items()):
+            if now < deadline:
+                continue
+            process.terminate()
+            process.join()
+            receiver.close()
+            del running[sentinel]
+            finish(TaskReport(task.day, task.part, task.input, TIMEOUT, seconds=task.timeout))
+
+    order = {(task.day, task.part): i for i, task in enumerate(tasks)}
+    return sorted(reports, key=lambda report: order[report.day, report.part])
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Run all days' solvers in parallel with per-solver timeouts.")
+    parser.add_argument("days", nargs="*", help="Days to run, e.g. 7 or day_7. Defaults to every day")
+    parser.add_argument("--part", "-p", action="append", dest="parts",
+                        help="Only run solvers with this name (repeatable)")
+    parser.add_argument("--input", help="Input file for every task. Defaults to each day's input.txt")
+    parser.add_argument("--param", action="append", type=parse_param, default=[],
+                        help="Solver parameter as key=value (repeatable), see python -m aoc --help")
+    parser.add_argument("--workers", type=int, default=None, help="Parallel processes, defaults to the CPU count")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Wall-clock seconds allowed per solver")
+    parser.add_argument("--json", dest="json_file", help="Write the report to this file")
+    parser.add_argument("--profile", nargs="?", const="profiles", metavar="DIR",
+                        help="Profile every solver and write .prof files to DIR (default: profiles)")
+    args = parser.parse_args(argv)
+
+    if args.profile:
+        # Inherited by the task processes
+        enable_profiling(args.profile)
+
+    days = [day_name(day) for day in args.days] or all_days()
+    tasks = make_tasks(days, args.parts, dict(args.param), args.timeout, args.input)
+    start_time = time.perf_counter()
+    reports = run_tasks(tasks, args.workers)
+    elapsed_time = time.perf_counter() - start_time
+
+    counts = {status: sum(report.status == status for report in reports) for status in (OK, TIMEOUT, ERROR)}
+    print(f"{len(reports)} solvers in {elapsed_time:.2f}s: "
+          f"{counts[OK]} ok, {counts[TIMEOUT]} timed out, {counts[ERROR]} failed")
+    if args.json_file:
+        with open(args.json_file, "w") as fout:
+            json.dump([report.to_dict() for report in reports], fout, indent=2)
+
+
+if __name__ == "__main__":
+    main()
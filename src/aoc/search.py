@@ -0,0 +1,298 @@
+"""
+Graph searches over integer node ids ``0 <= node < size``, such as ``Grid`` cell
+indexes or ``cell * 4 + direction`` states.
+
+Graphs are given as a ``neighbours(node)`` callable. For ``bfs`` it yields
+neighbour nodes, for the weighted searches it yields ``(neighbour, cost)``
+pairs. Distances and predecessors are kept in flat arrays indexed by node.
+
+Every search takes one or more sources and optional targets. With targets, the
+search stops as soon as the closest target is settled (or, with
+``all_paths=True``, once every node at that distance is settled, so that all
+shortest paths to it are known).
+"""
+import math
+from array import array
+from collections import deque
+from typing import Callable, Iterable, Iterator, Optional
+
+from aoc.priority_queue import PriorityQueue
+
+
+INF = math.inf
+NO_NODE = -1
+
+Neighbours = Callable[[int], Iterable[int]]
+WeightedNeighbours = Callable[[int], Iterable[tuple[int, float]]]
+
+
+class SearchResult:
+    def __init__(self, size: int, all_paths: bool):
+        self.distances = array("d", [INF]) * size
+        self.predecessors = array("q", [NO_NODE]) * size
+        # Every predecessor on a shortest path, only kept with all_paths=True
+        self.all_predecessors: Optional[dict[int, list[int]]] = {} if all_paths else None
+        # First target settled, if the search had targets and reached one
+        self.target: Optional[int] = None
+
+    def reached(self, node: int) -> bool:
+        return self.distances[node] != INF
+
+    def path(self, target: int) -> list[int]:
+        """
+        One shortest path from a source to ``target``, both included. Empty if unreachable.
+        """
+        if not self.reached(target):
+            return []
+        path = [target]
+        while self.predecessors[path[-1]] != NO_NODE:
+            path.append(self.predecessors[path[-1]])
+        path.reverse()
+        return path
+
+    def shortest_path_nodes(self, targets: Iterable[int]) -> set[int]:
+        """
+        Every node on any shortest path to the given targets. Needs ``all_paths=True``.
+        """
+        if self.all_predecessors is None:
+            raise ValueError("Search was run without all_paths=True")
+        stack = [target for target in targets if self.reached(target)]
+        nodes = set(stack)
+        while len(stack) > 0:
+            node = stack.pop()
+            for predecessor in self.all_predecessors.get(node, ()):
+                if predecessor not in nodes:
+                    nodes.add(predecessor)
+                    stack.append(predecessor)
+        return nodes
+
+    def path_counts(self) -> dict[int, int]:
+        """
+        Number of distinct shortest paths from any source to every settled node. Needs ``all_paths=True``
+        and positive edge costs.
+        """
+        if self.all_predecessors is None:
+            raise ValueError("Search was run without all_paths=True")
+        reached = sorted((node for node in range(len(self.distances)) if self.reached(node)),
+                         key=lambda node: self.distances[node])
+        counts = {}
+        for node in reached:
+            predecessors = self.all_predecessors.get(node)
+            counts[node] = sum(counts[predecessor] for predecessor in predecessors) if predecessors else 1
+        return counts
+
+    def _relax(self, node: int, neighbour: int, distance: float) -> bool:
+        """
+        Record ``node -> neighbour`` with ``distance``. Returns True if it is a strictly shorter distance.
+        """
+        if distance < self.distances[neighbour]:
+            self.distances[neighbour] = distance
+            self.predecessors[neighbour] = node
+            if self.all_predecessors is not None:
+                self.all_predecessors[neighbour] = [node]
+            return True
+        if self.all_predecessors is not None and distance == self.distances[neighbour] \
+                and node not in self.all_predecessors[neighbour]:
+            self.all_predecessors[neighbour].append(node)
+        return False
+
+
+def _start(size: int, sources: Iterable[int], all_paths: bool) -> tuple[SearchResult, list[int]]:
+    result = SearchResult(size, all_paths)
+    sources = list(sources)
+    for source in sources:
+        result.distances[source] = 0
+    return result, sources
+
+
+def _target_set(targets: Optional[Iterable[int]]) -> Optional[set[int]]:
+    return set(targets) if targets is not None else None
+
+
+def _should_stop(result: SearchResult, node: int, priority: float, targets: Optional[set[int]],
+                 all_paths: bool) -> bool:
+    """
+    Called with every settled node, in non-decreasing priority order.
+    """
+    if targets is None:
+        return False
+    if result.target is not None:
+        # Only still running to collect equal-length paths to the target
+        return priority > result.distances[result.target]
+    if node in targets:
+        result.target = node
+        return not all_paths
+    return False
+
+
+def bfs(size: int, sources: Iterable[int], neighbours: Neighbours, targets: Optional[Iterable[int]] = None,
+        all_paths: bool = False) -> SearchResult:
+    """
+    Breadth-first search on a graph where every edge costs 1.
+    """
+    result, queue = _start(size, sources, all_paths)
+    queue = deque(queue)
+    targets = _target_set(targets)
+    distances = result.distances
+    while len(queue) > 0:
+        node = queue.popleft()
+        distance = distances[node]
+        if _should_stop(result, node, distance, targets, all_paths):
+            break
+        for neighbour in neighbours(node):
+            if result._relax(node, neighbour, distance + 1):
+                queue.append(neighbour)
+    return result
+
+
+def zero_one_bfs(size: int, sources: Iterable[int], neighbours: WeightedNeighbours,
+                 targets: Optional[Iterable[int]] = None, all_paths: bool = False) -> SearchResult:
+    """
+    Shortest paths on a graph where every edge costs 0 or 1, with a deque instead of a priority queue.
+    """
+    result, queue = _start(size, sources, all_paths)
+    queue = deque(queue)
+    targets = _target_set(targets)
+    distances = result.distances
+    settled = bytearray(size)
+    while len(queue) > 0:
+        node = queue.popleft()
+        if settled[node]:
+            continue
+        settled[node] = True
+        distance = distances[node]
+        if _should_stop(result, node, distance, targets, all_paths):
+            break
+        for neighbour, cost in neighbours(node):
+            if result._relax(node, neighbour, distance + cost):
+                if cost == 0:
+                    queue.appendleft(neighbour)
+                else:
+                    queue.append(neighbour)
+    return result
+
+
+def a_star(size: int, sources: Iterable[int], neighbours: WeightedNeighbours,
+           heuristic: Callable[[int], float], targets: Optional[Iterable[int]] = None,
+           all_paths: bool = False) -> SearchResult:
+    """
+    A* with a consistent ``heuristic`` (a lower bound of the distance left to the closest target).
+    """
+    result, sources = _start(size, sources, all_paths)
+    queue: PriorityQueue[int] = PriorityQueue()
+    for source in sources:
+        queue.push(source, heuristic(source))
+    targets = _target_set(targets)
+    distances = result.distances
+    settled = bytearray(size)
+    while len(queue) > 0:
+        priority, node = queue.pop()
+        settled[node] = True
+        distance = distances[node]
+        if _should_stop(result, node, priority, targets, all_paths):
+            break
+        for neighbour, cost in neighbours(node):
+            if result._relax(node, neighbour, distance + cost) and not settled[neighbour]:
+                queue.push(neighbour, distance + cost + heuristic(neighbour))
+    return result
+
+
+def dijkstra(size: int, sources: Iterable[int], neighbours: WeightedNeighbours,
+             targets: Optional[Iterable[int]] = None, all_paths: bool = False) -> SearchResult:
+    """
+    Shortest paths on a graph with non-negative edge costs.
+    """
+    return a_star(size, sources, neighbours, lambda node: 0, targets, all_paths)
+
+
+def connected_components(size: int, neighbours: Neighbours) -> array:
+    """
+    Component label of every node of an undirected graph, labels numbered from 0 in node order.
+    """
+    labels = array("q", [NO_NODE]) * size
+    label = 0
+    for node in range(size):
+        if labels[node] != NO_NODE:
+            continue
+        labels[node] = label
+        stack = [node]
+        while len(stack) > 0:
+            current = stack.pop()
+            for neighbour in neighbours(current):
+                if labels[neighbour] == NO_NODE:
+                    labels[neighbour] = label
+                    stack.append(neighbour)
+        label += 1
+    return labels
+
+
+def reachable_from_each(size: int, sources: Iterable[int],
+                        neighbours: Neighbours) -> Iterator[tuple[int, list[int]]]:
+    """
+    ``(source, every node reachable from it)`` for each source in turn, the source included. The searches share
+    one visited array stamped with the search number, so each one only costs the nodes it reaches rather than
+    the whole graph.
+    """
+    stamps = array("q", [NO_NODE]) * size
+    for stamp, source in enumerate(sources):
+        stamps[source] = stamp
+        reachable = [source]
+        stack = [source]
+        while len(stack) > 0:
+            node = stack.pop()
+            for neighbour in neighbours(node):
+                if stamps[neighbour] != stamp:
+                    stamps[neighbour] = stamp
+                    reachable.append(neighbour)
+                    stack.append(neighbour)
+        yield source, reachable
+
+
+def strongly_connected_components(size: int, neighbours: Neighbours) -> list[list[int]]:
+    """
+    Strongly connected components of a directed graph by Tarjan's algorithm, without recursion. Every
+    component comes after all the components it has edges to, so the reversed list is a topological order.
+    """
+    index = array("q", [NO_NODE]) * size
+    low_link = array("q", [0]) * size
+    on_stack = bytearray(size)
+    stack = []
+    components = []
+    counter = 0
+    for root in range(size):
+        if index[root] != NO_NODE:
+            continue
+        # Call stack of (node, its neighbours still to visit)
+        work = [(root, iter(neighbours(root)))]
+        index[root] = low_link[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+        while len(work) > 0:
+            node, remaining = work[-1]
+            for neighbour in remaining:
+                if index[neighbour] == NO_NODE:
+                    index[neighbour] = low_link[neighbour] = counter
+                    counter += 1
+                    stack.append(neighbour)
+                    on_stack[neighbour] = 1
+                    work.append((neighbour, iter(neighbours(neighbour))))
+                    break
+                if on_stack[neighbour]:
+                    low_link[node] = min(low_link[node], index[neighbour])
+            else:
+                # Every neighbour is done, return to the caller
+                work.pop()
+                if len(work) > 0:
+                    parent = work[-1][0]
+                    low_link[parent] = min(low_link[parent], low_link[node])
+                if low_link[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = 0
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    return components
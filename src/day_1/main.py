@@ -1,13 +1,130 @@
-def part1():
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from aoc.benchmark import timed
+from aoc.engines import NUMPY, PYTHON, check_engine, np
+from aoc.external_sort import ExternalSorter, counts
+
+
+# Engines, picked with e.g. python -m aoc 1 --param engine=numpy
+EXTERNAL = "external"
+ENGINES = (PYTHON, NUMPY, EXTERNAL)
+
+# Bytes the external engine may use for the numbers, e.g. --param engine=external --param memory_budget=1000000
+MEMORY_BUDGET = 64 * 2 ** 20
+
+
+def read_columns_numpy(raw: str):
+    """
+    Both columns as int64 arrays, parsed by numpy in a single pass over the text.
+    """
+    values = np.fromstring(raw, dtype=np.int64, sep=" ")
+    if len(values) % 2 != 0:
+        raise ValueError("Expected two numbers on every line")
+    pairs = values.reshape(-1, 2)
+    return pairs[:, 0], pairs[:, 1]
+
+
+def solve_numpy(raw: str) -> tuple[int, int]:
+    """
+    Both parts from one read: sorted columns for the distance, value counts of the right column for the
+    similarity score.
+    """
+    firsts, seconds = read_columns_numpy(raw)
+    sorted_firsts = np.sort(firsts)
+    sorted_seconds = np.sort(seconds)
+    distance = int(np.abs(sorted_firsts - sorted_seconds).sum())
+
+    values, counts = np.unique(sorted_seconds, return_counts=True)
+    if len(values) == 0:
+        return distance, 0
+    # Where each left number would be among the right values, and whether it is actually there
+    slots = np.minimum(np.searchsorted(values, sorted_firsts), len(values) - 1)
+    found = values[slots] == sorted_firsts
+    similarity = int((sorted_firsts[found] * counts[slots[found]]).sum())
+    return distance, similarity
+
+
+def iter_lines(text: str) -> Iterator[str]:
+    """
+    Lines of the text one at a time, without a list of all of them like ``splitlines`` makes.
+    """
+    start = 0
+    while start < len(text):
+        end = text.find("\n", start)
+        if end == -1:
+            end = len(text)
+        yield text[start:end]
+        start = end + 1
+
+
+def sort_columns_external(lines: Iterable[str], directory: str,
+                          memory_budget: int) -> tuple[ExternalSorter, ExternalSorter]:
+    # The two columns share the budget
+    firsts = ExternalSorter(directory, memory_budget // 2)
+    seconds = ExternalSorter(directory, memory_budget // 2)
+    for line in lines:
+        if not line.strip():
+            continue
+        first, second = line.split()
+        firsts.add(int(first))
+        seconds.add(int(second))
+    return firsts, seconds
+
+
+def distance_external(lines: Iterable[str], memory_budget: int = MEMORY_BUDGET) -> int:
+    """
+    Part 1 within ``memory_budget`` bytes however long the lists are: sorted runs of each column are spilled
+    to temporary files, then both columns are merged back in order side by side. ``lines`` can be an open file.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        firsts, seconds = sort_columns_external(lines, directory, memory_budget)
+        return sum(abs(first - second) for first, second in zip(firsts.sorted(), seconds.sorted()))
+
+
+def similarity_external(lines: Iterable[str], memory_budget: int = MEMORY_BUDGET) -> int:
+    """
+    Part 2 within ``memory_budget`` bytes: the sorted columns are turned into streams of value counts,
+    which are joined like the two sides of a merge.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        firsts, seconds = sort_columns_external(lines, directory, memory_budget)
+        second_counts = counts(seconds.sorted())
+        second_value, second_count = next(second_counts, (None, 0))
+        total = 0
+        for value, first_count in counts(firsts.sorted()):
+            while second_value is not None and second_value < value:
+                second_value, second_count = next(second_counts, (None, 0))
+            if second_value is None:
+                break
+            if second_value == value:
+                total += value * first_count * second_count
+        return total
+
+
+@timed
+def part1(raw: str, engine: str = PYTHON, memory_budget: int = MEMORY_BUDGET):
+    check_engine(engine, ENGINES)
+    if engine == NUMPY:
+        total, _ = solve_numpy(raw)
+        print(total)
+        return total
+    if engine == EXTERNAL:
+        total = distance_external(iter_lines(raw), memory_budget)
+        print(total)
+        return total
     firsts = []
     seconds = []
-    with open("input.txt") as fin:
-        for line in fin:
-            first, second = line.strip().split()
-            first = int(first)
-            second = int(second)
-            firsts.append(first)
-            seconds.append(second)
+    for line in raw.splitlines():
+        first, second = line.strip().split()
+        first = int(first)
+        second = int(second)
+        firsts.append(first)
+        seconds.append(second)
     sorted_firsts = sorted(firsts)
     sorted_seconds = sorted(seconds)
     min_len = min(len(sorted_firsts), len(sorted_seconds))
@@ -15,23 +132,62 @@ def part1():
     for i, j in zip(sorted_firsts[:min_len], sorted_seconds[:min_len]):
         total += abs(i - j)
     print(total)
+    return total
 
 
-def part2():
+@timed
+def part2(raw: str, engine: str = PYTHON, memory_budget: int = MEMORY_BUDGET):
+    check_engine(engine, ENGINES)
+    if engine == NUMPY:
+        _, total = solve_numpy(raw)
+        print(total)
+        return total
+    if engine == EXTERNAL:
+        total = similarity_external(iter_lines(raw), memory_budget)
+        print(total)
+        return total
     occurences = {}
-    with open("input.txt") as fin:
-        for line in fin:
-            first, second = line.strip().split()
-            first = int(first)
-            second = int(second)
-            first_occ_first_col, first_occ_second_col = occurences.get(first, (0, 0))
-            occurences[first] = (first_occ_first_col + 1, first_occ_second_col)
-            second_occ_first_col, second_occ_second_col = occurences.get(second, (0, 0))
-            occurences[second] = (second_occ_first_col, second_occ_second_col + 1)
+    for line in raw.splitlines():
+        first, second = line.strip().split()
+        first = int(first)
+        second = int(second)
+        first_occ_first_col, first_occ_second_col = occurences.get(first, (0, 0))
+        occurences[first] = (first_occ_first_col + 1, first_occ_second_col)
+        second_occ_first_col, second_occ_second_col = occurences.get(second, (0, 0))
+        occurences[second] = (second_occ_first_col, second_occ_second_col + 1)
     total = 0
     for i, (occ_first_col, occ_second_col) in occurences.items():
         total += i * occ_first_col * occ_second_col
     print(total)
+    return total
+
+
+def solve_file_external(path: str, memory_budget: int = MEMORY_BUDGET) -> tuple[int, int]:
+    """
+    Both parts streamed from the file, one pass each, so that the input itself is never held in memory.
+    """
+    with open(path) as fin:
+        distance = distance_external(fin, memory_budget)
+    with open(path) as fin:
+        similarity = similarity_external(fin, memory_budget)
+    return distance, similarity
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Day 1, with inputs larger than memory streamed from disk.")
+    parser.add_argument("input", nargs="?", default=str(Path(__file__).with_name("input.txt")))
+    parser.add_argument("--external", action="store_true",
+                        help="Stream the file through the external sort instead of reading it")
+    parser.add_argument("--memory-budget", type=int, default=MEMORY_BUDGET, help="Bytes for the external sort")
+    args = parser.parse_args(argv)
+
+    if args.external:
+        distance, similarity = solve_file_external(args.input, args.memory_budget)
+        print(distance)
+        print(similarity)
+        return
+    part2(Path(args.input).read_text())
+
 
 if __name__ == "__main__":
-    part2()
+    main()
@@ -1,78 +1,57 @@
-from itertools import product
+import sys
+from pathlib import Path
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from aoc.benchmark import timed
+from aoc.cache import parse_grid
+from aoc.grid import Grid
+from aoc.search import bfs, reachable_from_each
 
-def get_data():
-    data = {}
-    zero_positions = []
-    with open("input.txt") as fin:
-        for line_no, line in enumerate(fin):
-            line = line.strip()
-            for char_no, char in enumerate(line):
-                num = int(char)
-                data[char_no, line_no] = num
-                if num == 0:
-                    zero_positions.append((char_no, line_no))
-        size = char_no + 1, line_no + 1
-        return data, zero_positions, size
 
+PEAK = "9"
 
-def get_surrounding_positions(start_position, size):
-    surrounding_positions = []
-    start_x, start_y = start_position
-    size_x, size_y = size
-    for delta_x, delta_y in product((0, 1, -1), repeat=2):
-        if delta_x == 0 and delta_y == 0:
-            continue
-        if delta_x != 0 and delta_y != 0:
-            continue
-        if not (0 <= start_x + delta_x < size_x):
-            continue
-        if not (0 <= start_y + delta_y < size_y):
-            continue
-        surrounding_positions.append((start_x + delta_x, start_y + delta_y))
-    return surrounding_positions
 
+def get_data(raw: str):
+    data = parse_grid(raw)
+    zero_positions = data.find_all("0")
+    return data, zero_positions
 
-def part1():
-    data, zero_positions, size = get_data()
+
+def uphill_neighbours(data: Grid):
+    cells = data.cells
+
+    def neighbours(position: int):
+        for neighbour in data.neighbours(position):
+            if cells[neighbour] == cells[position] + 1:
+                yield neighbour
+    return neighbours
+
+
+@timed
+def part1(raw: str):
+    data, zero_positions = get_data(raw)
+    peak = ord(PEAK)
+    # Each trailhead only costs the cells it can reach, not a search over the whole map
     score = 0
-    for zero_position in zero_positions:
-        # Depth-first search
-        stack = [zero_position]
-        visited = set()
-        while len(stack) > 0:
-            current_position = stack.pop()
-            visited.add(current_position)
-            if data[current_position] == 9:
-                score += 1
-                continue
-            for neighbour in get_surrounding_positions(current_position, size):
-                if data[neighbour] != data[current_position] + 1:
-                    continue
-                if neighbour in visited:
-                    continue
-                stack.append(neighbour)
+    for _, reachable in reachable_from_each(len(data), zero_positions, uphill_neighbours(data)):
+        score += sum(1 for position in reachable if data.cells[position] == peak)
     print(f"Part 1: {score}")
+    return score
 
 
-def part2():
-    data, zero_positions, size = get_data()
-    score = 0
-    for zero_position in zero_positions:
-        # Depth-first search WITHOUT visited
-        stack = [zero_position]
-        while len(stack) > 0:
-            current_position = stack.pop()
-            if data[current_position] == 9:
-                score += 1
-                continue
-            for neighbour in get_surrounding_positions(current_position, size):
-                if data[neighbour] != data[current_position] + 1:
-                    continue
-                stack.append(neighbour)
+@timed
+def part2(raw: str):
+    data, zero_positions = get_data(raw)
+    # Every step climbs by exactly 1, so every trail is a shortest path from some trailhead
+    # and the rating sum is the number of shortest paths from all trailheads to all peaks
+    result = bfs(len(data), zero_positions, uphill_neighbours(data), all_paths=True)
+    path_counts = result.path_counts()
+    score = sum(path_counts.get(peak, 0) for peak in data.find_all(PEAK))
     print(f"Part 2: {score}")
+    return score
 
 
 if __name__ == "__main__":
-    part1()
-    part2()
+    raw = Path(__file__).with_name("input.txt").read_text()
+    part1(raw)
+    part2(raw)
@@ -1,31 +1,16 @@
+import sys
 import threading
 import time
 from collections import defaultdict
-from functools import wraps
+from pathlib import Path
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from aoc.benchmark import timed
 
-def timed(arg=None):
-    def decorator(func):
-        custom_name = arg if isinstance(arg, str) else None
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            start_time_time = time.perf_counter()
-            result = func(*args, **kwargs)
-            end_time_time = time.perf_counter()
-            elapsed_time = end_time_time - start_time_time
-            function_name = custom_name or func.__name__
-            print(f"Function '{function_name}' executed in {elapsed_time:.6f} seconds.")
-            return result
-        return wrapper
-    if callable(arg):
-        return decorator(arg)
-    return decorator
 
-
-def get_data():
-    with open("input.txt") as fin:
-        content = fin.read().strip().split()
-        return list(map(int, content))
+def get_data(raw: str):
+    content = raw.strip().split()
+    return list(map(int, content))
 
 
 def blink(sequence: list[int], steps=1):
@@ -74,55 +59,57 @@ def print_elapsed(task_name, start_time_time, stop_event):
         time.sleep(0.1)  # Update interval (adjust as needed)
 
 
-def part1_slow():
-    start_time = time.perf_counter()
-    sequence = get_data()
-    result = len(blink(sequence, 25))
-    end_time = time.perf_counter()
-    print(f"Part 1 (slow): {result} ({end_time - start_time:.4f}s)")
+@timed
+def part1_slow(raw: str, blinks: int = 25):
+    sequence = get_data(raw)
+    result = len(blink(sequence, blinks))
+    print(f"Part 1 (slow): {result}")
+    return result
 
 
-def part2_slow():
-    sequence = get_data()
+@timed
+def part2_slow(raw: str, blinks: int = 75):
+    sequence = get_data(raw)
     # Blocking code
     start_time = time.perf_counter()
     stop_event = threading.Event()
     t = threading.Thread(target=print_elapsed, args=("Part 2 (slow)", start_time, stop_event))
     t.start()
     try:
-        result = len(blink(sequence, 75))
+        result = len(blink(sequence, blinks))
     finally:
         stop_event.set()
         t.join()  # Wait for the thread to finish
 
-    end_time = time.perf_counter()
-    print(f"\rPart 2 (slow): {result} ({end_time - start_time:.4f}s)")
+    print(f"\rPart 2 (slow): {result}")
+    return result
 
 
-def part1_fast():
-    start_time = time.perf_counter()
-    sequence = get_data()
+@timed
+def part1_fast(raw: str, blinks: int = 25):
+    sequence = get_data(raw)
     occurrences = defaultdict(int)
     for i in sequence:
         occurrences[i] += 1
-    result = sum(fast_blink(occurrences, 25).values())
-    end_time = time.perf_counter()
-    print(f"Part 1 (fast): {result} ({end_time - start_time:.4f}s)")
+    result = sum(fast_blink(occurrences, blinks).values())
+    print(f"Part 1 (fast): {result}")
+    return result
 
 
-def part2_fast():
-    start_time = time.perf_counter()
-    sequence = get_data()
+@timed
+def part2_fast(raw: str, blinks: int = 75):
+    sequence = get_data(raw)
     occurrences = defaultdict(int)
     for i in sequence:
         occurrences[i] += 1
-    result = sum(fast_blink(occurrences, 75).values())
-    end_time = time.perf_counter()
-    print(f"Part 2 (fast): {result} ({end_time - start_time:.4f}s)")
+    result = sum(fast_blink(occurrences, blinks).values())
+    print(f"Part 2 (fast): {result}")
+    return result
 
 
 if __name__ == "__main__":
-    part1_fast()
-    part1_slow()
-    part2_fast()
-    part2_slow()
+    raw = Path(__file__).with_name("input.txt").read_text()
+    part1_fast(raw)
+    part1_slow(raw)
+    part2_fast(raw)
+    part2_slow(raw)
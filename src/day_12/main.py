@@ -1,92 +1,49 @@
-import math
-import time
-from collections import deque, defaultdict
-from functools import wraps
-from itertools import product, chain
+import sys
+from collections import defaultdict
+from itertools import chain
+from pathlib import Path
 from typing import Optional
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from aoc.benchmark import timed
+from aoc.cache import parse_grid
+from aoc.grid import Grid
+from aoc.search import connected_components
+
 
 CoordinatePair = tuple[int, int]
 
 
-def timed(arg=None):
-    def decorator(func):
-        custom_name = arg if isinstance(arg, str) else None
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            start_time_time = time.perf_counter()
-            result = func(*args, **kwargs)
-            end_time_time = time.perf_counter()
-            elapsed_time = end_time_time - start_time_time
-            function_name = custom_name or func.__name__
-            print(f"Function '{function_name}' executed in {elapsed_time:.6f} seconds.")
-            return result
-        return wrapper
-    if callable(arg):
-        return decorator(arg)
-    return decorator
-
-
-def get_data():
-    data: dict[CoordinatePair, str] = {}
-    with open("input.txt") as fin:
-        for line_no, line in enumerate(fin):
-            line = line.strip()
-            for char_no, char in enumerate(line):
-                data[char_no, line_no] = char
-        size: CoordinatePair = char_no + 1, line_no + 1
-        return data, size
-
-
-def get_surrounding_positions(start_position, size):
-    surrounding_positions = []
-    start_x, start_y = start_position
-    size_x, size_y = size
-    for delta_x, delta_y in product((0, 1, -1), repeat=2):
-        if delta_x == 0 and delta_y == 0:
-            continue
-        if delta_x != 0 and delta_y != 0:
-            continue
-        if not (0 <= start_x + delta_x < size_x):
-            continue
-        if not (0 <= start_y + delta_y < size_y):
-            continue
-        surrounding_positions.append((start_x + delta_x, start_y + delta_y))
-    return surrounding_positions
-
-
-def get_perimeter(region: set[CoordinatePair]):
+def get_data(raw: str):
+    return parse_grid(raw)
+
+
+def get_perimeter(data: Grid, region: set[int]):
     perimeter = 0
+    cells = data.cells
     for position in region:
         fence_count = 4
-        for neighbour in get_surrounding_positions(position, (math.inf, math.inf)):
-            if neighbour in region:
+        for neighbour in data.neighbours(position):
+            # Neighbours with the same plant are always part of the same region
+            if cells[neighbour] == cells[position]:
                 fence_count -= 1
         perimeter += fence_count
     return perimeter
 
 
-def find_regions(data: dict[CoordinatePair, str], size: CoordinatePair):
-    visited = set()
-    regions = []
-    for position, char in data.items():
-        current_region = set()
-        if position in visited:
-            continue
-        # BFS
-        queue = deque([position])
-        while len(queue) > 0:
-            current_position = queue.popleft()
-            visited.add(current_position)
-            current_region.add(current_position)
-            for neighbour in get_surrounding_positions(current_position, size):
-                if neighbour in visited:
-                    continue
-                if data[current_position] != data[neighbour]:
-                    continue
-                queue.appendleft(neighbour)
-        regions.append(current_region)
-    return regions
+def find_regions(data: Grid) -> list[set[int]]:
+    cells = data.cells
+
+    def same_plant_neighbours(position: int):
+        for neighbour in data.neighbours(position):
+            if cells[neighbour] == cells[position]:
+                yield neighbour
+
+    labels = connected_components(len(data), same_plant_neighbours)
+    regions: defaultdict[int, set[int]] = defaultdict(set)
+    for position, label in enumerate(labels):
+        regions[label].add(position)
+    return list(regions.values())
 
 
 def get_edges(region: set[CoordinatePair]):
@@ -140,27 +97,30 @@ def get_edges(region: set[CoordinatePair]):
 
 
 @timed
-def part1():
-    data, size = get_data()
-    regions = find_regions(data, size)
+def part1(raw: str):
+    data = get_data(raw)
+    regions = find_regions(data)
     fence_price = 0
     for region in regions:
-        fence_price += len(region) * get_perimeter(region)
+        fence_price += len(region) * get_perimeter(data, region)
     print(f"Part 1: {fence_price}")
+    return fence_price
 
 
 @timed
-def part2():
-    data, size = get_data()
-    regions = find_regions(data, size)
+def part2(raw: str):
+    data = get_data(raw)
+    regions = find_regions(data)
     fence_price = 0
     for region in regions:
-        horizontal_edges, vertical_edges = get_edges(region)
+        horizontal_edges, vertical_edges = get_edges({data.position(position) for position in region})
         fence_price += len(region) * (len(list(chain.from_iterable(horizontal_edges.values()))) +
                                       len(list(chain.from_iterable(vertical_edges.values()))))
     print(f"Part 2: {fence_price}")
+    return fence_price
 
 
 if __name__ == "__main__":
-    part1()
-    part2()
+    raw = Path(__file__).with_name("input.txt").read_text()
+    part1(raw)
+    part2(raw)
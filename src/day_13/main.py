@@ -1,51 +1,34 @@
 import math
-import time
-from functools import wraps
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from aoc.benchmark import timed
 
 
 CoordinatePair = tuple[int, int]
 
 
-def timed(arg=None):
-    def decorator(func):
-        custom_name = arg if isinstance(arg, str) else None
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            start_time_time = time.perf_counter()
-            result = func(*args, **kwargs)
-            end_time_time = time.perf_counter()
-            elapsed_time = end_time_time - start_time_time
-            function_name = custom_name or func.__name__
-            print(f"Function '{function_name}' executed in {elapsed_time:.6f} seconds.")
-            return result
-        return wrapper
-    if callable(arg):
-        return decorator(arg)
-    return decorator
-
-
-def get_data():
-    with open("input.txt") as fin:
-        content = fin.read()
-        raw_machines = content.split("\n\n")
-        machines = []
-        for raw_machine in raw_machines:
-            btn_a = btn_b = prize = None
-            for line in raw_machine.splitlines():
-                if line.startswith("Button A: "):
-                    ax = int(line[line.find("X+") + 2:line.find(",")])
-                    ay = int(line[line.find("Y+") + 2:])
-                    btn_a = (ax, ay)
-                elif line.startswith("Button B: "):
-                    bx = int(line[line.find("X+") + 2:line.find(",")])
-                    by = int(line[line.find("Y+") + 2:])
-                    btn_b = (bx, by)
-                elif line.startswith("Prize: "):
-                    px = int(line[line.find("X=") + 2:line.find(",")])
-                    py = int(line[line.find("Y=") + 2:])
-                    prize = (px, py)
-            machines.append((btn_a, btn_b, prize))
-        return machines
+def get_data(raw: str):
+    raw_machines = raw.split("\n\n")
+    machines = []
+    for raw_machine in raw_machines:
+        btn_a = btn_b = prize = None
+        for line in raw_machine.splitlines():
+            if line.startswith("Button A: "):
+                ax = int(line[line.find("X+") + 2:line.find(",")])
+                ay = int(line[line.find("Y+") + 2:])
+                btn_a = (ax, ay)
+            elif line.startswith("Button B: "):
+                bx = int(line[line.find("X+") + 2:line.find(",")])
+                by = int(line[line.find("Y+") + 2:])
+                btn_b = (bx, by)
+            elif line.startswith("Prize: "):
+                px = int(line[line.find("X=") + 2:line.find(",")])
+                py = int(line[line.find("Y=") + 2:])
+                prize = (px, py)
+        machines.append((btn_a, btn_b, prize))
+    return machines
 
 
 def is_prime(potential_prime: int):
@@ -111,20 +94,23 @@ def get_cost(machines):
 
 
 @timed
-def part1():
-    machines = get_data()
+def part1(raw: str):
+    machines = get_data(raw)
     cost = get_cost(machines)
     print(f"Part 1: {cost}")
+    return cost
 
 
 @timed
-def part2():
-    machines = get_data()
+def part2(raw: str):
+    machines = get_data(raw)
     machines = [(*rest, (px + 10000000000000, py + 10000000000000)) for *rest, (px, py) in machines]
     cost = get_cost(machines)
     print(f"Part 2: {cost}")
+    return cost
 
 
 if __name__ == "__main__":
-    part1()
-    part2()
+    raw = Path(__file__).with_name("input.txt").read_text()
+    part1(raw)
+    part2(raw)
@@ -1,9 +1,13 @@
 import math
 import sys
-import time
+from array import array
 from collections import defaultdict
-from functools import wraps
 from itertools import count
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from aoc.benchmark import timed
+from aoc.cache import cached
 
 CoordinatePair = tuple[int, int]
 
@@ -11,35 +15,31 @@ CoordinatePair = tuple[int, int]
 SIZE = 101, 103
 
 
-def timed(arg=None):
-    def decorator(func):
-        custom_name = arg if isinstance(arg, str) else None
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            start_time_time = time.perf_counter()
-            result = func(*args, **kwargs)
-            end_time_time = time.perf_counter()
-            elapsed_time = end_time_time - start_time_time
-            function_name = custom_name or func.__name__
-            print(f"Function '{function_name}' executed in {elapsed_time:.6f} seconds.")
-            return result
-        return wrapper
-    if callable(arg):
-        return decorator(arg)
-    return decorator
-
-
-def get_data():
+def encode_robots(robots: list[tuple[CoordinatePair, CoordinatePair]]) -> dict:
+    # One row of position x, position y, velocity x, velocity y per robot
+    table = array("q")
+    for position, velocity in robots:
+        table.extend(position)
+        table.extend(velocity)
+    return {"robots": table}
+
+
+def decode_robots(fields: dict) -> list[tuple[CoordinatePair, CoordinatePair]]:
+    table = fields["robots"]
+    return [((table[i], table[i + 1]), (table[i + 2], table[i + 3])) for i in range(0, len(table), 4)]
+
+
+@cached("day_14", encode_robots, decode_robots)
+def get_data(raw: str):
     robots = []
-    with open("input.txt") as fin:
-        for line in fin:
-            line = line.strip()
-            raw_position, raw_velocity = line.split()
-            raw_position = raw_position.removeprefix("p=")
-            raw_velocity = raw_velocity.removeprefix("v=")
-            pos: CoordinatePair = tuple(map(int, raw_position.split(",")))
-            vel: CoordinatePair = tuple(map(int, raw_velocity.split(",")))
-            robots.append((pos, vel))
+    for line in raw.splitlines():
+        line = line.strip()
+        raw_position, raw_velocity = line.split()
+        raw_position = raw_position.removeprefix("p=")
+        raw_velocity = raw_velocity.removeprefix("v=")
+        pos: CoordinatePair = tuple(map(int, raw_position.split(",")))
+        vel: CoordinatePair = tuple(map(int, raw_velocity.split(",")))
+        robots.append((pos, vel))
     return robots
 
 
@@ -53,13 +53,13 @@ def move(position, velocity, size, repeat):
 
 
 @timed
-def part1():
-    robots = get_data()
+def part1(raw: str, size: CoordinatePair = SIZE, seconds: int = 100):
+    robots = get_data(raw)
     quadrants = [[] for _ in range(4)]
-    size_x, size_y = SIZE
+    size_x, size_y = size
     half_size_x, half_size_y = size_x // 2, size_y // 2
     for position, velocity in robots:
-        new_position = move(position, velocity, SIZE, 100)
+        new_position = move(position, velocity, size, seconds)
         new_pos_x, new_pos_y = new_position
         if new_pos_x < half_size_x and new_pos_y < half_size_y:
             quadrants[0].append(new_position)
@@ -74,17 +74,51 @@ def part1():
     for quadrant in quadrants:
         safety_factor *= len(quadrant)
     print(f"Part 1: {safety_factor}")
+    return safety_factor
 
 
-def part2():
-    robots = get_data()
+def axis_variance(robots, axis: int, size: int, seconds: int) -> float:
+    coordinates = [(position[axis] + velocity[axis] * seconds) % size for position, velocity in robots]
+    mean = sum(coordinates) / len(coordinates)
+    return sum((coordinate - mean) ** 2 for coordinate in coordinates) / len(coordinates)
+
+
+# O(n * (w + h)) for a room of w by h
+@timed
+def part2(raw: str, size: CoordinatePair = SIZE):
+    """
+    The first second the robots are the most bunched up, which is when they draw the tree. Each coordinate
+    comes back every ``w`` or ``h`` seconds, so each one is the least spread at some second of its own cycle,
+    and the two seconds are combined by the Chinese remainder theorem.
+    """
+    robots = get_data(raw)
+    size_x, size_y = size
+    best_x = min(range(size_x), key=lambda seconds: axis_variance(robots, 0, size_x, seconds))
+    best_y = min(range(size_y), key=lambda seconds: axis_variance(robots, 1, size_y, seconds))
+    period = math.lcm(size_x, size_y)
+    for seconds in range(best_x, period, size_x):
+        if seconds % size_y == best_y:
+            break
+    else:
+        raise ValueError(f"No second is the least spread on both axes in a room of {size_x} by {size_y}")
+    # The robots start where they are after a full period
+    seconds = seconds or period
+    print(f"Part 2: {seconds}")
+    return seconds
+
+
+def part2_interactive(raw: str, size: CoordinatePair = SIZE):
+    """
+    Show the robots every time they are more bunched up than before, until they look like a Christmas tree.
+    """
+    robots = get_data(raw)
     min_deviation = math.inf
-    size_x, size_y = SIZE
+    size_x, size_y = size
 
     for i in count(start=1):
         all_positions = defaultdict(int)
         for position, velocity in robots:
-            all_positions[move(position, velocity, SIZE, i)] += 1
+            all_positions[move(position, velocity, size, i)] += 1
         mean_position_x = sum(position_x for position_x, _ in all_positions) / len(robots)
         mean_position_y = sum(position_y for _, position_y in all_positions) / len(robots)
         deviation_x = deviation_y = 0
@@ -107,9 +141,14 @@ def part2():
 
         min_deviation = deviation
 
-    print(f"Part 2: {i}")
+    print(f"Part 2 - Interactive: {i}")
+    return i
 
 
 if __name__ == "__main__":
-    part1()
-    part2()
+    raw = Path(__file__).with_name("input.txt").read_text()
+    part1(raw)
+    part2(raw)
+    # Needs a terminal to step through the candidates, so only on request
+    if "--interactive" in sys.argv[1:]:
+        part2_interactive(raw)
@@ -1,8 +1,10 @@
-import time
-from collections import defaultdict
-from functools import wraps, reduce
+import sys
+from pathlib import Path
 
-CoordinatePair = tuple[int, int]
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from aoc.benchmark import timed
+from aoc.cache import parse_grid
+from aoc.grid import Grid
 
 
 WALL = "#"
@@ -13,6 +15,9 @@ DOUBLE_BOX_LAST = "]"
 ROBOT = "@"
 DOUBLE_BOX = DOUBLE_BOX_FIRST + DOUBLE_BOX_LAST
 
+WALL_VALUE, FREE_VALUE, BOX_VALUE, ROBOT_VALUE = map(ord, (WALL, FREE, BOX, ROBOT))
+DOUBLE_BOX_FIRST_VALUE, DOUBLE_BOX_LAST_VALUE = map(ord, DOUBLE_BOX)
+
 
 DIRECTIONS = {
     "<": (-1, 0),
@@ -22,166 +27,108 @@ DIRECTIONS = {
 }
 
 
-def timed(arg=None):
-    def decorator(func):
-        custom_name = arg if isinstance(arg, str) else None
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            start_time_time = time.perf_counter()
-            result = func(*args, **kwargs)
-            end_time_time = time.perf_counter()
-            elapsed_time = end_time_time - start_time_time
-            function_name = custom_name or func.__name__
-            print(f"Function '{function_name}' executed in {elapsed_time:.6f} seconds.")
-            return result
-        return wrapper
-    if callable(arg):
-        return decorator(arg)
-    return decorator
-
-
 def get_data(raw: str):
-    data = defaultdict(set)
-    moves = []
     raw_map, raw_moves = raw.split("\n\n")
-    for line_no, map_line in enumerate(raw_map.splitlines()):
-        for char_no, char in enumerate(map_line):
-            if char == FREE:
-                continue
-            data[char].add((char_no, line_no))
+    grid = parse_grid(raw_map)
+    moves = []
     raw_moves = "".join(raw_moves.splitlines())
     for raw_move in raw_moves:
-        moves.append(DIRECTIONS[raw_move])
-
-    return data, moves
+        delta_x, delta_y = DIRECTIONS[raw_move]
+        moves.append(delta_x + delta_y * grid.width)
 
+    return grid, moves
 
-def get_data_part_1():
-    with open("input.txt") as fin:
-        raw = fin.read()
-        return get_data(raw)
 
+def get_data_part_1(raw: str):
+    return get_data(raw)
 
-def get_data_part_2():
-    with open("input.txt") as fin:
-        raw = fin.read()
-        raw = raw.replace(WALL, WALL * 2)
-        raw = raw.replace(BOX, DOUBLE_BOX_FIRST + DOUBLE_BOX_LAST)
-        raw = raw.replace(FREE, FREE * 2)
-        raw = raw.replace(ROBOT, ROBOT + FREE)
-        return get_data(raw)
 
+def get_data_part_2(raw: str):
+    raw = raw.replace(WALL, WALL * 2)
+    raw = raw.replace(BOX, DOUBLE_BOX_FIRST + DOUBLE_BOX_LAST)
+    raw = raw.replace(FREE, FREE * 2)
+    raw = raw.replace(ROBOT, ROBOT + FREE)
+    return get_data(raw)
 
-def move(position, direction):
-    return position[0] + direction[0], position[1] + direction[1]
 
-
-def make_move_part_1(data: dict[str, set], direction: CoordinatePair):
-    data_copy = data.copy()
-    from_ = data_copy[ROBOT].pop()
-    first_move = last_move = move(from_, direction)
+def make_move_part_1(grid: Grid, robot: int, direction: int) -> int:
+    cells = grid.cells
+    first_move = last_move = robot + direction
     while True:
-        if last_move in data[WALL]:
+        if cells[last_move] == WALL_VALUE:
             # Don't make any move if WALL is hit
-            data_copy[ROBOT].add(from_)
-            return data_copy
-        if last_move not in data[BOX]:
-            data_copy[BOX].add(last_move)
+            return robot
+        if cells[last_move] != BOX_VALUE:
             break
         # last_move hits a BOX, check next box
-        last_move = move(last_move, direction)
-    data_copy[BOX].remove(first_move)
-    data_copy[ROBOT].add(first_move)
-    return data_copy
-
-
-def make_move_part_2(data: dict[str, set], direction: CoordinatePair):
-    data_copy = data.copy()
-    from_ = data_copy[ROBOT].pop()
-    first_move = move(from_, direction)
-    last_affected_squares = {first_move}
-    found_double_box_last_positions = set()
-    found_double_box_first_positions = set()
-    while True:
-        if len(last_affected_squares.intersection(data[WALL])) > 0:
+        last_move += direction
+    # Pushing a row of boxes is the same as moving the first box to the end of the row
+    cells[last_move] = cells[first_move]
+    cells[first_move] = ROBOT_VALUE
+    cells[robot] = FREE_VALUE
+    return first_move
+
+
+def make_move_part_2(grid: Grid, robot: int, direction: int) -> int:
+    cells = grid.cells
+    vertical = abs(direction) != 1
+    # Every cell that moves, in the order they are found
+    affected_squares = [robot]
+    seen = {robot}
+    for square in affected_squares:
+        next_square = square + direction
+        if cells[next_square] == WALL_VALUE:
             # Don't make any move if WALL is hit
-            data_copy[ROBOT].add(from_)
-            return data_copy
-        intercept_with_double_box_first_positions = last_affected_squares.intersection(data[DOUBLE_BOX_FIRST])
-        intercept_with_double_box_last_positions = last_affected_squares.intersection(data[DOUBLE_BOX_LAST])
-
-        # All affected squares free
-        if len(intercept_with_double_box_first_positions) == 0 and len(intercept_with_double_box_last_positions) == 0:
-            for found_box_positions, box_key in zip((found_double_box_first_positions, found_double_box_last_positions), DOUBLE_BOX):
-                data_copy[box_key] -= found_box_positions
-                data_copy[box_key].update(move(found_box_position, direction)
-                                          for found_box_position in found_box_positions)
-            break
-
-        # handle box cells
-        for box_first_position in intercept_with_double_box_first_positions:
-            intercept_with_double_box_last_positions.add((box_first_position[0] + 1, box_first_position[1]))
-        for box_last_position in intercept_with_double_box_last_positions:
-            intercept_with_double_box_first_positions.add((box_last_position[0] - 1, box_last_position[1]))
-        all_intercept_positions = intercept_with_double_box_first_positions | intercept_with_double_box_last_positions
-        found_double_box_first_positions.update(intercept_with_double_box_first_positions)
-        found_double_box_last_positions.update(intercept_with_double_box_last_positions)
-        last_affected_squares.clear()
-        for affected_position in all_intercept_positions:
-            new_affected_position = move(affected_position, direction)
-            if new_affected_position not in all_intercept_positions:
-                last_affected_squares.add(new_affected_position)
-
-    data_copy[ROBOT].add(first_move)
-    return data_copy
-
-
-# Helper for debugging
-def print_map(data: dict[str, set[CoordinatePair]]):
-    inverted_data = {}
-    size_x = size_y = 0
-    for char, positions in data.items():
-        for pos_x, pos_y in positions:
-            if pos_x >= size_x:
-                size_x = pos_x
-            if pos_y >= size_y:
-                size_y = pos_y
-            inverted_data[pos_x, pos_y] = char
-    size_x += 1
-    size_y += 1
-    for y in range(size_y):
-        for x in range(size_x):
-            if (x - 1, y) in data[DOUBLE_BOX]:
-                continue
-            if (x, y) in inverted_data:
-                print(inverted_data[(x, y)], end="")
-            else:
-                print(FREE, end="")
-        print()
+            return robot
+        pushed = []
+        if cells[next_square] == DOUBLE_BOX_FIRST_VALUE:
+            pushed = [next_square, next_square + 1] if vertical else [next_square]
+        elif cells[next_square] == DOUBLE_BOX_LAST_VALUE:
+            pushed = [next_square, next_square - 1] if vertical else [next_square]
+        for pushed_square in pushed:
+            if pushed_square not in seen:
+                seen.add(pushed_square)
+                affected_squares.append(pushed_square)
+
+    moved_values = [cells[square] for square in affected_squares]
+    for square in affected_squares:
+        cells[square] = FREE_VALUE
+    for square, value in zip(affected_squares, moved_values):
+        cells[square + direction] = value
+    return robot + direction
+
+
+def get_gps_sum(grid: Grid, box: str) -> int:
+    gps_sum = 0
+    for position in grid.find_all(box):
+        box_x, box_y = grid.position(position)
+        gps_sum += box_x + box_y * 100
+    return gps_sum
 
 
 @timed
-def part1():
-    data, moves = get_data_part_1()
+def part1(raw: str):
+    grid, moves = get_data_part_1(raw)
+    robot = grid.find(ROBOT)
     for direction in moves:
-        data = make_move_part_1(data, direction)
-    gps_sum = 0
-    for box_x, box_y in data[BOX]:
-        gps_sum += box_x + box_y * 100
+        robot = make_move_part_1(grid, robot, direction)
+    gps_sum = get_gps_sum(grid, BOX)
     print(f"Part 1: {gps_sum}")
+    return gps_sum
 
 
 @timed
-def part2():
-    data, moves = get_data_part_2()
+def part2(raw: str):
+    grid, moves = get_data_part_2(raw)
+    robot = grid.find(ROBOT)
     for direction in moves:
-        data = make_move_part_2(data, direction)
-    gps_sum = 0
-    for box_x, box_y in data[DOUBLE_BOX_FIRST]:
-        gps_sum += box_x + box_y * 100
+        robot = make_move_part_2(grid, robot, direction)
+    gps_sum = get_gps_sum(grid, DOUBLE_BOX_FIRST)
     print(f"Part 2: {gps_sum}")
+    return gps_sum
 
 
 if __name__ == "__main__":
-    part1()
-    part2()
+    raw = Path(__file__).with_name("input.txt").read_text()
+    part1(raw)
+    part2(raw)
@@ -1,28 +1,13 @@
 import math
 import pprint
-import time
+import sys
 from collections import defaultdict, deque
 from dataclasses import dataclass, field
-from functools import wraps
+from pathlib import Path
 from typing import TypeVar, Generic, Optional
 
-
-def timed(arg=None):
-    def decorator(func):
-        custom_name = arg if isinstance(arg, str) else None
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            start_time_time = time.perf_counter()
-            result = func(*args, **kwargs)
-            end_time_time = time.perf_counter()
-            elapsed_time = end_time_time - start_time_time
-            function_name = custom_name or func.__name__
-            print(f"Function '{function_name}' executed in {elapsed_time:.6f} seconds.")
-            return result
-        return wrapper
-    if callable(arg):
-        return decorator(arg)
-    return decorator
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from aoc.benchmark import timed
 
 
 @dataclass
@@ -104,21 +89,25 @@ class Computer:
             return self._cdv(operand)
 
     @classmethod
-    def load(cls, filename: str):
+    def parse(cls, raw: str):
         instance = cls()
-        with open(filename) as fin:
-            for line in fin:
-                line = line.strip()
-                if line.startswith("Register A:"):
-                    instance.register_a = int(line.strip().removeprefix("Register A: "))
-                elif line.startswith("Register B:"):
-                    instance.register_b = int(line.strip().removeprefix("Register B: "))
-                elif line.startswith("Register C:"):
-                    instance.register_c = int(line.strip().removeprefix("Register C: "))
-                elif line.startswith("Program: "):
-                    instance.program = [int(num) for num in line.removeprefix("Program: ").split(",")]
+        for line in raw.splitlines():
+            line = line.strip()
+            if line.startswith("Register A:"):
+                instance.register_a = int(line.strip().removeprefix("Register A: "))
+            elif line.startswith("Register B:"):
+                instance.register_b = int(line.strip().removeprefix("Register B: "))
+            elif line.startswith("Register C:"):
+                instance.register_c = int(line.strip().removeprefix("Register C: "))
+            elif line.startswith("Program: "):
+                instance.program = [int(num) for num in line.removeprefix("Program: ").split(",")]
         return instance
 
+    @classmethod
+    def load(cls, filename: str):
+        with open(filename) as fin:
+            return cls.parse(fin.read())
+
     def copy(self):
         copy = Computer()
         copy.register_a = self.register_a
@@ -139,6 +128,7 @@ class Computer:
             self.skip_pointer_move = False
         if print_output:
             print(",".join(str(output) for output in self.output))
+        return ",".join(str(output) for output in self.output)
 
     def test_reg_a(self):
         valid_reg_a = []
@@ -158,22 +148,24 @@ class Computer:
                         stack.append(next_test_reg_a)
         if len(valid_reg_a) == 0:
             print("Cannot find a suitable register a value")
-        else:
-            print(f"Minimum register a value: {min(valid_reg_a)}")
+            return None
+        print(f"Minimum register a value: {min(valid_reg_a)}")
+        return min(valid_reg_a)
 
 
 @timed
-def part1():
-    computer = Computer().load("input.txt")
-    computer.run()
+def part1(raw: str):
+    computer = Computer.parse(raw)
+    return computer.run()
 
 
 @timed
-def part2():
-    computer = Computer().load("input.txt")
-    computer.test_reg_a()
+def part2(raw: str):
+    computer = Computer.parse(raw)
+    return computer.test_reg_a()
 
 
 if __name__ == "__main__":
-    part1()
-    part2()
+    raw = Path(__file__).with_name("input.txt").read_text()
+    part1(raw)
+    part2(raw)
@@ -1,31 +1,15 @@
-import time
-from functools import wraps
+import sys
+from pathlib import Path
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from aoc.benchmark import timed
 
-def timed(arg=None):
-    def decorator(func):
-        custom_name = arg if isinstance(arg, str) else None
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            start_time_time = time.perf_counter()
-            result = func(*args, **kwargs)
-            end_time_time = time.perf_counter()
-            elapsed_time = end_time_time - start_time_time
-            function_name = custom_name or func.__name__
-            print(f"Function '{function_name}' executed in {elapsed_time:.6f} seconds.")
-            return result
-        return wrapper
-    if callable(arg):
-        return decorator(arg)
-    return decorator
 
-
-def get_data():
-    with open("input.txt") as fin:
-        content = fin.read().splitlines()
-        available_patterns = content[0].split(", ")
-        target_patterns = content[2:]
-        return available_patterns, target_patterns
+def get_data(raw: str):
+    content = raw.splitlines()
+    available_patterns = content[0].split(", ")
+    target_patterns = content[2:]
+    return available_patterns, target_patterns
 
 
 cache = {}
@@ -60,26 +44,31 @@ def possible_combinations_bottom_up(available_patterns: list[str], target_patter
 
 
 @timed
-def part1():
-    available_patterns, target_patterns = get_data()
+def part1(raw: str):
+    available_patterns, target_patterns = get_data(raw)
+    # The memo is only valid for one set of available patterns
+    cache.clear()
     possible_patterns = []
     for target_pattern in target_patterns:
         if possible_combinations_memo(available_patterns, target_pattern) > 0:
         # if possible_combinations_bottom_up(available_patterns, target_pattern) > 0:
             possible_patterns.append(target_pattern)
     print(f"Part 1: {len(possible_patterns)}")
+    return len(possible_patterns)
 
 
 @timed
-def part2():
-    available_patterns, target_patterns = get_data()
+def part2(raw: str):
+    available_patterns, target_patterns = get_data(raw)
     possible_patterns = 0
     for target_pattern in target_patterns:
         possible_patterns += possible_combinations_bottom_up(available_patterns, target_pattern)
         # possible_patterns += possible_combinations_memo(available_patterns, target_pattern)
     print(f"Part 2: {possible_patterns}")
+    return possible_patterns
 
 
 if __name__ == '__main__':
-    part1()
-    part2()
\ No newline at end of file
+    raw = Path(__file__).with_name("input.txt").read_text()
+    part1(raw)
+    part2(raw)
\ No newline at end of file
@@ -1,15 +1,94 @@
+import sys
 from itertools import combinations
+from pathlib import Path
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from aoc.benchmark import timed
+from aoc.engines import NUMPY, PYTHON, check_engine, np
 
-def part1():
+
+# Engines, picked with e.g. python -m aoc 2 --param engine=numpy
+ENGINES = (PYTHON, NUMPY)
+
+
+def read_reports_numpy(raw: str):
+    """
+    All reports as a 2D int64 array padded with zeros on the right, and the number of levels of each.
+    Blank lines are skipped.
+    """
+    values = np.fromstring(raw, dtype=np.int64, sep=" ")
+    text = np.frombuffer(raw.encode(), dtype=np.uint8)
+    is_space = np.isin(text, np.frombuffer(b" \t\r\n", dtype=np.uint8))
+    # A number starts wherever a non-space follows a space, and belongs to the line of the newlines before it
+    starts = np.flatnonzero(~is_space & np.concatenate(([True], is_space[:-1])))
+    line_numbers = np.searchsorted(np.flatnonzero(text == ord("\n")), starts)
+    lengths = np.bincount(line_numbers)
+    lengths = lengths[lengths > 0]
+    if len(values) != len(starts):
+        raise ValueError("Expected only whitespace separated numbers")
+    # At least 3 columns so that every report has room for a removal bridging two levels
+    width = max(int(lengths.max(initial=0)), 3)
+    levels = np.zeros((len(lengths), width), dtype=np.int64)
+    levels[np.arange(width) < lengths[:, None]] = values
+    return levels, lengths
+
+
+def good_steps(steps, valid, sign: int):
+    """
+    Which steps go in the direction of ``sign`` by 1 to 3. Steps outside the report (not ``valid``) are good.
+    """
+    directed = sign * steps
+    return ((directed >= 1) & (directed <= 3)) | ~valid
+
+
+# O(n)
+def safe_reports_numpy(levels, lengths, max_removals: int = 0):
+    """
+    Mask of the safe reports, with at most one removal allowed. All the single removal variants are checked
+    at once: removing level ``r`` keeps the steps before ``r - 1`` and after ``r``, and adds the step from
+    ``r - 1`` to ``r + 1``, so it is safe when the prefix and suffix are, and so is the bridging step.
+    """
+    if max_removals not in (0, 1):
+        raise ValueError("The numpy engine only supports up to one removal")
+    rows, width = levels.shape
+    columns = np.arange(width)
+    steps = np.diff(levels, axis=1)
+    steps_valid = columns[:-1] < lengths[:, None] - 1
+    bridges = levels[:, 2:] - levels[:, :-2]
+    # Bridging r - 1 and r + 1 only matters when both are in the report
+    bridges_valid = columns[1:-1] < lengths[:, None] - 1
+    safe = np.zeros(rows, dtype=bool)
+    for sign in (1, -1):
+        good = good_steps(steps, steps_valid, sign)
+        safe |= good.all(axis=1)
+        if max_removals == 0:
+            continue
+        # prefix[:, j]: steps before j are all good, suffix[:, j]: steps from j on are all good
+        edge = np.ones((rows, 1), dtype=bool)
+        prefix = np.logical_and.accumulate(np.hstack((edge, good)), axis=1)
+        suffix = np.logical_and.accumulate(np.hstack((good, edge))[:, ::-1], axis=1)[:, ::-1]
+        bridge_good = np.hstack((edge, good_steps(bridges, bridges_valid, sign), edge))
+        before = np.hstack((edge, prefix[:, :-1]))
+        after = np.hstack((suffix[:, 1:], edge))
+        safe |= (before & bridge_good & after).any(axis=1)
+    return safe
+
+
+@timed
+def part1(raw: str, engine: str = PYTHON):
+    check_engine(engine, ENGINES)
+    if engine == NUMPY:
+        safe_count = int(safe_reports_numpy(*read_reports_numpy(raw)).sum())
+        print("Part 1:", safe_count)
+        return safe_count
     safe_count = 0
-    with open("input.txt") as fin:
-        for line in fin:
-            parsed_line = list(map(int, line.strip().split()))
-            valid = part1_validate(parsed_line)
-            if valid:
-                safe_count += 1
+    for line in raw.splitlines():
+        parsed_line = list(map(int, line.strip().split()))
+        valid = part1_validate(parsed_line)
+        if valid:
+            safe_count += 1
     print("Part 1:", safe_count)
+    return safe_count
 
 
 def part1_validate(nums):
@@ -34,21 +113,28 @@ def part1_validate(nums):
     return True
             
 
-def part2():
+@timed
+def part2(raw: str, max_removals: int = 1, engine: str = PYTHON):
+    check_engine(engine, ENGINES)
+    if engine == NUMPY:
+        safe_count = int(safe_reports_numpy(*read_reports_numpy(raw), max_removals).sum())
+        print("Part 2:", safe_count)
+        return safe_count
     safe_count = 0
-    with open("input.txt") as fin:
-        for line in fin:
-            parsed_line = list(map(int, line.strip().split()))
-
-            # Pick a way to run this
-            # valid = part2_validate_bruteforce(list(map(int, line.strip().split())), True)
-            # valid = part2_validate_efficient(list(map(int, line.strip().split())), True)
-            valid = (
-                part2_validate_efficient_nicer(parsed_line, True) or
-                part2_validate_efficient_nicer(list(reversed(parsed_line)), True))
-            if valid:
-                safe_count += 1
+    for line in raw.splitlines():
+        parsed_line = list(map(int, line.strip().split()))
+
+        # Pick a way to run this
+        # valid = part2_validate_bruteforce(list(map(int, line.strip().split())), True)
+        # valid = part2_validate_efficient(list(map(int, line.strip().split())), True)
+        # valid = (
+        #     part2_validate_efficient_nicer(parsed_line, True) or
+        #     part2_validate_efficient_nicer(list(reversed(parsed_line)), True))
+        valid = validate_with_removals(parsed_line, max_removals)
+        if valid:
+            safe_count += 1
     print("Part 2:", safe_count)
+    return safe_count
 
 
 # O(n) (O(4n) to be exact), not very elegant
@@ -142,6 +228,33 @@ def part2_validate_bruteforce(nums, tolerable=False):
     return True
 
 
+# O(n * k)
+def validate_with_removals(nums: list[int], max_removals: int = 1) -> bool:
+    """
+    Whether the report is safe once at most ``max_removals`` levels are removed, without copying it.
+
+    For each direction, ``removals[i]`` is the fewest removals that make a safe report of the levels up to
+    and including ``i``, keeping ``i``. The previous kept level is one of the ``max_removals + 1`` before
+    ``i``, since everything between them is removed.
+    """
+    length = len(nums)
+    if length - max_removals <= 1:
+        return True
+    for sign in (1, -1):
+        removals = [0] * length
+        for i in range(length):
+            # Remove everything before i
+            best = i
+            for previous in range(max(0, i - max_removals - 1), i):
+                if 1 <= sign * (nums[i] - nums[previous]) <= 3:
+                    best = min(best, removals[previous] + i - previous - 1)
+            removals[i] = best
+            # Remove everything after i
+            if best + length - 1 - i <= max_removals:
+                return True
+    return False
+
+
 def part2_validate_raf(nums):
     if len(nums) < 2:
         return 0
@@ -155,5 +268,6 @@ def part2_validate_raf(nums):
 
 
 if __name__ == "__main__":
-    part1()
-    part2()
+    raw = Path(__file__).with_name("input.txt").read_text()
+    part1(raw)
+    part2(raw)
@@ -1,55 +1,26 @@
-import time
+import sys
 from collections import defaultdict
-from functools import wraps
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from aoc.benchmark import timed
+from aoc.cache import parse_grid
+from aoc.grid import Grid
+from aoc.search import bfs
 
 CoordinatePair = tuple[int, int]
 Position = Direction = CoordinatePair
 
 
-DIRECTIONS = {
-    (-1, 0),    # Left
-    (1, 0),     # Right
-    (0, -1),    # Up
-    (0, 1),     # Down
-}
 WALL = "#"
 FREE = "."
 START = "S"
 END = "E"
 
 
-def timed(arg=None):
-    def decorator(func):
-        custom_name = arg if isinstance(arg, str) else None
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            start_time_time = time.perf_counter()
-            result = func(*args, **kwargs)
-            end_time_time = time.perf_counter()
-            elapsed_time = end_time_time - start_time_time
-            function_name = custom_name or func.__name__
-            print(f"Function '{function_name}' executed in {elapsed_time:.6f} seconds.")
-            return result
-        return wrapper
-    if callable(arg):
-        return decorator(arg)
-    return decorator
-
-
-def get_data():
-    walls = set()
-    start = end = (0, 0)
-    with open("input.txt") as fin:
-        for line_no, line in enumerate(fin):
-            line = line.strip()
-            for char_no, char in enumerate(line):
-                if char == WALL:
-                    walls.add((char_no, line_no))
-                elif char == START:
-                    start = (char_no, line_no)
-                elif char == END:
-                    end = (char_no, line_no)
-        return walls, start, end
+def get_data(raw: str):
+    grid = parse_grid(raw)
+    return grid, grid.find(START), grid.find(END)
 
 
 def move(position: Position, direction: Direction):
@@ -60,28 +31,32 @@ def get_manhattan_distance(p1: Position, p2: Position):
     return abs(p1[0] - p2[0]) + abs(p1[1] - p2[1])
 
 
-def get_jump_positions(position: Position, distances: dict[Position, int], manhattan_distance: int) -> set[Position]:
-    surrounding_free_positions: set[Position] = set()
+def get_jump_positions(grid: Grid, position: int, distances: dict[int, int], manhattan_distance: int) -> set[int]:
+    surrounding_free_positions: set[int] = set()
+    coordinates = grid.position(position)
     for x in range(manhattan_distance + 1):
         for y in range(manhattan_distance + 1 - x):
             if x == y == 0:
                 continue
             potential_positions = {
-                move(position, (x, y)),
-                move(position, (-x, y)),
-                move(position, (x, -y)),
-                move(position, (-x, -y)),
+                move(coordinates, (x, y)),
+                move(coordinates, (-x, y)),
+                move(coordinates, (x, -y)),
+                move(coordinates, (-x, -y)),
             }
-            for potential_position in potential_positions:
+            for potential_x, potential_y in potential_positions:
+                if not grid.in_bounds(potential_x, potential_y):
+                    continue
+                potential_position = grid.index(potential_x, potential_y)
                 if potential_position in distances:
                     surrounding_free_positions.add(potential_position)
     return surrounding_free_positions
 
 
-def get_potential_cheats(distances: dict[Position, int], cheat_length: int) -> set[tuple[Position, Position]]:
-    potential_cheats: set[tuple[Position, Position]] = set()
+def get_potential_cheats(grid: Grid, distances: dict[int, int], cheat_length: int) -> set[tuple[int, int]]:
+    potential_cheats: set[tuple[int, int]] = set()
     for position, distance in distances.items():
-        free_jump_destinations = get_jump_positions(position, distances, cheat_length)
+        free_jump_destinations = get_jump_positions(grid, position, distances, cheat_length)
 
         if len(free_jump_destinations) <= 1:
             continue
@@ -95,34 +70,33 @@ def get_potential_cheats(distances: dict[Position, int], cheat_length: int) -> s
     return potential_cheats
 
 
-def get_distances(walls: set[Position], start: Position, end: Position) -> dict[Position, int]:
-    current_distance = 0
-    current_position = start
-    distances = {}
-    while True:
-        distances[current_position] = current_distance
-        if current_position == end:
-            return distances
-        for direction in DIRECTIONS:
-            neighbour = move(current_position, direction)
-            if neighbour in walls:
-                continue
-            if neighbour in distances:
-                continue
-            current_distance += 1
-            current_position = neighbour
-            break
+def get_distances(grid: Grid, start: int, end: int) -> dict[int, int]:
+    wall = ord(WALL)
+    cells = grid.cells
+
+    def neighbours(position: int):
+        for neighbour in grid.neighbours(position):
+            if cells[neighbour] != wall:
+                yield neighbour
+
+    result = bfs(len(grid), [start], neighbours, targets=[end])
+    if not result.reached(end):
+        raise ValueError("Cannot find path from start to end.")
+    # The track is a single path, so every reached cell is on the way from start to end
+    end_distance = result.distances[end]
+    return {position: int(distance) for position, distance in enumerate(result.distances) if distance <= end_distance}
 
 
-def get_cheat_benefits(walls: set[Position], start: Position, end: Position, cheat_length: int) -> dict[int, set[tuple[Position, Position]]]:
-    distances = get_distances(walls, start, end)
-    potential_cheats = get_potential_cheats(distances, cheat_length)
-    cheat_benefits: defaultdict[int, set[tuple[Position, Position]]] = defaultdict(set)
+def get_cheat_benefits(grid: Grid, start: int, end: int, cheat_length: int) -> dict[int, set[tuple[int, int]]]:
+    distances = get_distances(grid, start, end)
+    potential_cheats = get_potential_cheats(grid, distances, cheat_length)
+    cheat_benefits: defaultdict[int, set[tuple[int, int]]] = defaultdict(set)
 
     for i, potential_cheat in enumerate(potential_cheats, start=1):
         print(f"\rEvaluating {potential_cheat}: {i}/{len(potential_cheats)}", end="")
         potential_cheat_start, potential_cheat_dest = potential_cheat
-        saved_distance = distances[potential_cheat_dest] - distances[potential_cheat_start] - get_manhattan_distance(potential_cheat_start, potential_cheat_dest)
+        saved_distance = distances[potential_cheat_dest] - distances[potential_cheat_start] - \
+            get_manhattan_distance(grid.position(potential_cheat_start), grid.position(potential_cheat_dest))
 
         cheat_benefits[saved_distance].add(potential_cheat)
 
@@ -130,29 +104,32 @@ def get_cheat_benefits(walls: set[Position], start: Position, end: Position, che
 
 
 @timed
-def part1():
-    walls, start, end = get_data()
-    cheat_benefits = get_cheat_benefits(walls, start, end, 2)
+def part1(raw: str, min_saving: int = 100):
+    grid, start, end = get_data(raw)
+    cheat_benefits = get_cheat_benefits(grid, start, end, 2)
 
     good_cheat_count = 0
     for benefit, cheats in cheat_benefits.items():
-        if benefit >= 100:
+        if benefit >= min_saving:
             good_cheat_count += len(cheats)
     print(f"\nPart 1: {good_cheat_count}")
+    return good_cheat_count
 
 
 @timed
-def part2():
-    walls, start, end = get_data()
-    cheat_benefits = get_cheat_benefits(walls, start, end, 20)
+def part2(raw: str, min_saving: int = 100):
+    grid, start, end = get_data(raw)
+    cheat_benefits = get_cheat_benefits(grid, start, end, 20)
 
     good_cheat_count = 0
     for benefit, cheats in cheat_benefits.items():
-        if benefit >= 100:
+        if benefit >= min_saving:
             good_cheat_count += len(cheats)
     print(f"\nPart 2: {good_cheat_count}")
+    return good_cheat_count
 
 
 if __name__ == '__main__':
-    part1()
-    part2()
\ No newline at end of file
+    raw = Path(__file__).with_name("input.txt").read_text()
+    part1(raw)
+    part2(raw)
\ No newline at end of file
@@ -1,8 +1,11 @@
 import math
 import pprint
-import time
+import sys
 from collections import defaultdict
-from functools import wraps
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from aoc.benchmark import timed
 
 CoordinatePair = tuple[int, int]
 Position = Direction = CoordinatePair
@@ -34,27 +37,8 @@ DIRECTIONAL_CODE_POSITIONS = {
 REVERSE_DIRECTIONAL_CODE_POSITIONS = {position: key for key, position in DIRECTIONAL_CODE_POSITIONS.items()}
 
 
-def timed(arg=None):
-    def decorator(func):
-        custom_name = arg if isinstance(arg, str) else None
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            start_time_time = time.perf_counter()
-            result = func(*args, **kwargs)
-            end_time_time = time.perf_counter()
-            elapsed_time = end_time_time - start_time_time
-            function_name = custom_name or func.__name__
-            print(f"Function '{function_name}' executed in {elapsed_time:.6f} seconds.")
-            return result
-        return wrapper
-    if callable(arg):
-        return decorator(arg)
-    return decorator
-
-
-def get_data():
-    with open("input.txt") as fin:
-        return fin.read().splitlines()
+def get_data(raw: str):
+    return raw.splitlines()
 
 
 def move(position: Position, direction: Direction):
@@ -120,27 +104,30 @@ def perform_clicks(code: str, iteration: int):
 
 
 @timed
-def part1():
-    codes = get_data()
+def part1(raw: str, depth: int = 3):
+    codes = get_data(raw)
 
     complexity = 0
     for code in codes:
-        shortest_clicks = get_shortest_clicks(code, 3, numeric=True)
+        shortest_clicks = get_shortest_clicks(code, depth, numeric=True)
         complexity += int(code.removesuffix("A")) * len(shortest_clicks)
     print(f"Part 1: {complexity}")
+    return complexity
 
 
 @timed
-def part2():
-    codes = get_data()
+def part2(raw: str, depth: int = 25):
+    codes = get_data(raw)
     complexity = 0
     for code in codes:
         print(code)
-        shortest_clicks = get_shortest_clicks(code, 25, numeric=True)
+        shortest_clicks = get_shortest_clicks(code, depth, numeric=True)
         complexity += int(code.removesuffix("A")) * len(shortest_clicks)
     print(f"Part 2: {complexity}")
+    return complexity
 
 
 if __name__ == '__main__':
-    part1()
-    # part2()
\ No newline at end of file
+    raw = Path(__file__).with_name("input.txt").read_text()
+    part1(raw)
+    # part2(raw)
\ No newline at end of file
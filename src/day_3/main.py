@@ -1,125 +1,178 @@
+import argparse
+import mmap
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from enum import Enum
-
-def get_input():
-    with open("input.txt") as fin:
-        return fin.read()
-
-
-def process_plain_text(text, pattern):
-    if text.startswith(pattern):
-        return True, len(pattern), pattern
-    return False, 0, None
-
-
-def process_mul(text):
-    return process_plain_text(text, "mul(")
-
-
-def process_comma(text):
-    return process_plain_text(text, ",")
-
-
-def process_close(text):
-    return process_plain_text(text, ")")
-
-
-def process_arg(text):
-    # Maximum 3 characters
-    if not text[0].isdecimal():
-        return False, 0, None
-    digits = text[0]
-    for i in range(1, 3):
-        potential_digit = text[i]
-        if not potential_digit.isdecimal():
-            return True, i, int(digits)
-        digits += potential_digit
-    return True, 3, int(digits)
-    
-
-def find_next_mul(text):
-    process_funcs = [process_mul, process_arg, process_comma, process_arg, process_close]
-    pointer = 0
-    while pointer < len(text):
-        found = None
-        for process_index, process_func in enumerate(process_funcs):
-            valid, next_pointer_delta, result = process_func(text[pointer:])
-            # invalid, move to next character
-            if not valid:
-                pointer += 1
-                found = None
-                break
-
-            # valid
-            if process_index == 0:
-                found = []
-            
-            pointer += next_pointer_delta
-            found.append(result)
-            
-            
-        if found is not None:
-            return found, pointer
-    return None, len(text)
-
-
-def find_next_do_dont(text):
-    next_do = text.find("do()")
-    next_dont = text.find("don't()")
-    if next_do == -1 and next_dont == -1:
-        return None, len(text)
-    if next_do != -1 and next_dont == -1:
-        return True, next_do + 4
-    if next_dont != -1 and next_do == -1:
-        return False, next_dont + 7
-    if next_do != -1 and next_dont != -1:
-        return next_do < next_dont, min(next_do, next_dont) + (4 if next_do < next_dont else 7)
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from aoc.benchmark import timed
+
+
+# One alternative per token, the groups tell them apart
+TOKEN_PATTERN = re.compile(r"mul\((\d{1,3}),(\d{1,3})\)|(do\(\))|(don't\(\))")
+# The same for bytes and mmaps
+BYTES_TOKEN_PATTERN = re.compile(TOKEN_PATTERN.pattern.encode())
+# mul(123,456)
+MAX_TOKEN_LENGTH = 12
+
+# Bytes per chunk of a file scanned in parallel
+CHUNK_SIZE = 64 * 2 ** 20
+
+
+class Token(Enum):
+    MUL = "mul"
+    DO = "do"
+    DONT = "don't"
+
+
+def tokens(text: Union[str, bytes, mmap.mmap], start: int = 0,
+           end: Optional[int] = None) -> Iterator[tuple[Token, int]]:
+    """
+    The ``mul(a,b)``, ``do()`` and ``don't()`` instructions in order, with the product for a ``mul``
+    and 0 otherwise. A single left to right pass of the compiled pattern, no slicing.
+
+    Only the instructions starting in ``[start, end)`` are found, reading up to a token's length past
+    ``end`` for those that straddle it. No instruction can start inside another one, so the instructions of
+    consecutive ranges are exactly those of the whole text.
+    """
+    pattern = TOKEN_PATTERN if isinstance(text, str) else BYTES_TOKEN_PATTERN
+    if end is None:
+        end = len(text)
+    for match in pattern.finditer(text, start, min(end + MAX_TOKEN_LENGTH - 1, len(text))):
+        if match.start() >= end:
+            return
+        arg1, arg2, do, _ = match.groups()
+        if arg1 is not None:
+            yield Token.MUL, int(arg1) * int(arg2)
+        elif do is not None:
+            yield Token.DO, 0
+        else:
+            yield Token.DONT, 0
+
+
+# O(n)
+def solve(text: str) -> tuple[int, int]:
+    """
+    Both parts from one pass over the tokens: the sum of every product, and of those that are enabled.
+    """
+    total = 0
+    enabled_total = 0
+    enabled = True
+    for token, product in tokens(text):
+        if token is Token.MUL:
+            total += product
+            if enabled:
+                enabled_total += product
+        else:
+            enabled = token is Token.DO
+    return total, enabled_total
+
+
+@dataclass
+class ChunkResult:
+    """
+    What a chunk adds to both parts, whatever the state it starts in.
+    """
+    total: int = 0
+    # Products before the chunk's first do() or don't(), enabled only if the chunk starts enabled
+    leading: int = 0
+    # Enabled products from the first do() or don't() on
+    enabled_total: int = 0
+    # Whether the chunk ends enabled, None if it has no do() or don't()
+    ends_enabled: Optional[bool] = None
+
+
+def scan_chunk(text: Union[str, bytes, mmap.mmap], start: int, end: int) -> ChunkResult:
+    result = ChunkResult()
+    for token, product in tokens(text, start, end):
+        if token is Token.MUL:
+            result.total += product
+            if result.ends_enabled is None:
+                result.leading += product
+            elif result.ends_enabled:
+                result.enabled_total += product
+        else:
+            result.ends_enabled = token is Token.DO
+    return result
+
+
+def scan_file_chunk(path: str, start: int, end: int) -> ChunkResult:
+    with open(path, "rb") as fin, mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+        return scan_chunk(mapping, start, end)
+
+
+def stitch(results: list[ChunkResult]) -> tuple[int, int]:
+    """
+    Both parts from the results of consecutive chunks, passing the enable state from each to the next.
+    """
+    total = 0
+    enabled_total = 0
+    enabled = True
+    for result in results:
+        total += result.total
+        if enabled:
+            enabled_total += result.leading
+        enabled_total += result.enabled_total
+        if result.ends_enabled is not None:
+            enabled = result.ends_enabled
+    return total, enabled_total
+
+
+# O(n)
+def solve_file(path: str, chunk_size: int = CHUNK_SIZE, workers: Optional[int] = None) -> tuple[int, int]:
+    """
+    Both parts for a file of any size. The file is mapped rather than read, and its chunks are scanned in a
+    process pool, each worker mapping the file itself so that only offsets are sent to it.
+    """
+    size = Path(path).stat().st_size
+    if size == 0:
+        return 0, 0
+    bounds = [(start, min(start + chunk_size, size)) for start in range(0, size, chunk_size)]
+    if len(bounds) == 1 or workers == 1:
+        results = [scan_file_chunk(path, start, end) for start, end in bounds]
+    else:
+        with ProcessPoolExecutor(workers) as executor:
+            results = list(executor.map(scan_file_chunk, [path] * len(bounds), *zip(*bounds)))
+    return stitch(results)
 
 
 # O(n) worst case
-def part1():
-    text = get_input()
-    pointer = 0
-    expressions_found = []
-    while True:
-        found, next_pointer_delta = find_next_mul(text[pointer:])
-        if found is None:
-            break
-        pointer += next_pointer_delta
-        expressions_found.append(found)
-    
-    total = 0
-    for _, arg1, _, arg2, _ in expressions_found:
-        total += arg1 * arg2
+@timed
+def part1(text: str):
+    total, _ = solve(text)
     print("Part 1", total)
+    return total
 
 
-# O(n^2) worst case
-def part2():
-    text = get_input()
-    activated = True
-    pointer = 0
-    expressions_found = []
-    while True:
-        new_activated, next_activation_pointer_delta = find_next_do_dont(text[pointer:])
-        mul_found, next_mul_pointer_delta = find_next_mul(text[pointer:])
-        
-        if mul_found is None:
-            break
-        
-        if not activated or next_activation_pointer_delta < next_mul_pointer_delta:
-            pointer += next_activation_pointer_delta
-            activated = new_activated
-            continue
-        pointer += next_mul_pointer_delta
-        expressions_found.append(mul_found)
-        
-    total = 0
-        
-    for _, arg1, _, arg2, _ in expressions_found:
-        total += arg1 * arg2
+# O(n) worst case
+@timed
+def part2(text: str):
+    _, total = solve(text)
     print("Part 2", total)
+    return total
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Day 3, with large files scanned in parallel chunks.")
+    parser.add_argument("input", nargs="?", default=str(Path(__file__).with_name("input.txt")))
+    parser.add_argument("--chunked", action="store_true", help="Map the file and scan it in chunks")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Bytes per chunk")
+    parser.add_argument("--workers", type=int, default=None, help="Processes, defaults to the CPU count")
+    args = parser.parse_args(argv)
+
+    if args.chunked:
+        total, enabled_total = solve_file(args.input, args.chunk_size, args.workers)
+        print("Part 1", total)
+        print("Part 2", enabled_total)
+        return
+    text = Path(args.input).read_text()
+    part1(text)
+    part2(text)
 
 
 if __name__ == "__main__":
-    part1()
-    part2()
+    main()
@@ -1,19 +1,41 @@
+import sys
 from enum import Enum
-from itertools import product
+from itertools import chain, product
+from pathlib import Path
 from pprint import pprint
+from typing import Iterator
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from aoc.aho_corasick import AhoCorasick
+from aoc.benchmark import timed
+from aoc.engines import NUMPY, PYTHON, check_engine, np
 
 
 MOVEMENTS = set(product(range(-1, 2), repeat=2))
 MOVEMENTS.remove((0, 0))
 DIAGONAL_MOVEMENTS = set(movement for movement in MOVEMENTS if 0 not in movement)
 
+# Engines, picked with e.g. python -m aoc 4 --param engine=numpy
+AHO_CORASICK = "aho_corasick"
+ENGINES = (PYTHON, NUMPY, AHO_CORASICK)
+# Crossings need positions, which the automaton doesn't keep
+PART2_ENGINES = (PYTHON, NUMPY)
+
+
+def word_list(words) -> list[str]:
+    """
+    Words to search for, given as a list or as a comma separated string, e.g. --param words=XMAS,SANTA
+    """
+    if isinstance(words, str):
+        words = words.split(",")
+    return [word.strip() for word in words if word.strip()]
 
-def get_data():
+
+def get_data(raw: str):
     positions = {}
-    with open("input.txt") as fin:
-        for line_no, line in enumerate(fin):
-            for char_no, char in enumerate(line.strip()):
-               positions[char_no, line_no] = char
+    for line_no, line in enumerate(raw.splitlines()):
+        for char_no, char in enumerate(line.strip()):
+           positions[char_no, line_no] = char
     return positions
 
 
@@ -40,16 +62,92 @@ def find_next_match(positions, pattern, movement, matches=None):
             
 
 
-def part1():
-    positions = get_data()
+def get_grid_numpy(raw: str):
+    """
+    The letters as a 2D uint8 array of their codes.
+    """
+    lines = [line.strip() for line in raw.splitlines() if line.strip()]
+    if len({len(line) for line in lines}) > 1:
+        raise ValueError("Expected all lines to have the same length")
+    return np.frombuffer("".join(lines).encode(), dtype=np.uint8).reshape(len(lines), -1)
+
+
+# O(n * k) for a word of length k
+def word_mask(grid, word: str, movement: tuple[int, int], anchor: int = 0):
+    """
+    Mask of the cells where ``word`` is spelt along ``movement``, with its letter at index ``anchor`` on the
+    cell. It is the AND of the equality masks of the letters, each shifted by its offset from the anchor.
+    """
+    rows, columns = grid.shape
+    margin = len(word)
+    # Letters that would fall off the grid match nothing
+    padded = np.pad(grid, margin)
+    move_x, move_y = movement
+    mask = np.ones(grid.shape, dtype=bool)
+    for index, letter in enumerate(word):
+        offset_x = margin + (index - anchor) * move_x
+        offset_y = margin + (index - anchor) * move_y
+        mask &= padded[offset_y:offset_y + rows, offset_x:offset_x + columns] == ord(letter)
+    return mask
+
+
+def grid_lines(positions) -> Iterator[str]:
+    """
+    Every row, column, diagonal and anti-diagonal of the grid as a string, each read once.
+    """
+    lines = {}
+    # positions are in reading order, so every line is built along increasing y, then x for rows
+    for (x, y), char in positions.items():
+        for key in (("row", y), ("column", x), ("diagonal", x - y), ("anti-diagonal", x + y)):
+            lines.setdefault(key, []).append(char)
+    return ("".join(line) for line in lines.values())
+
+
+# O(n + m) for m occurrences, whatever the number of words
+def count_words(positions, words: list[str]) -> list[int]:
+    """
+    Occurrences of each word in all 8 directions, from one Aho-Corasick pass over every grid line and one
+    over its reverse.
+    """
+    automaton = AhoCorasick(words)
+    lines = list(grid_lines(positions))
+    return automaton.count(chain(lines, (line[::-1] for line in lines)))
+
+
+@timed
+def part1(raw: str, engine: str = PYTHON, words="XMAS"):
+    check_engine(engine, ENGINES)
+    words = word_list(words)
+    if engine == AHO_CORASICK:
+        total = sum(count_words(get_data(raw), words))
+        print("Part 1:", total)
+        return total
+    if engine == NUMPY:
+        grid = get_grid_numpy(raw)
+        total = sum(int(word_mask(grid, word, movement).sum()) for word in words for movement in MOVEMENTS)
+        print("Part 1:", total)
+        return total
+    positions = get_data(raw)
     matches = []
-    for movement in MOVEMENTS:
-        matches.extend(find_next_match(positions, "XMAS", movement))
+    for word in words:
+        for movement in MOVEMENTS:
+            matches.extend(find_next_match(positions, word, movement))
     print("Part 1:", len(matches))
+    return len(matches)
         
 
-def part2():
-    positions = get_data()
+@timed
+def part2(raw: str, engine: str = PYTHON):
+    check_engine(engine, PART2_ENGINES)
+    if engine == NUMPY:
+        grid = get_grid_numpy(raw)
+        # How many diagonal MAS cross at each cell, anchored on the A
+        crossings = sum(word_mask(grid, "MAS", movement, anchor=1).astype(np.int8)
+                        for movement in DIAGONAL_MOVEMENTS)
+        total = int((crossings >= 2).sum())
+        print("Part 2:", total)
+        return total
+    positions = get_data(raw)
     matches = []
     found = set()
     found_twice = set()
@@ -61,9 +159,11 @@ def part2():
         else:
             found.add(middle_match)
     print("Part 2:", len(found_twice))
+    return len(found_twice)
                 
         
 if __name__ == "__main__":
-    part1()
-    part2()
+    raw = Path(__file__).with_name("input.txt").read_text()
+    part1(raw)
+    part2(raw)
 
@@ -1,46 +1,156 @@
-import time
-from functools import wraps
+import sys
+from array import array
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Optional
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from aoc.benchmark import timed
+from aoc.cache import cached, decode_rows, encode_rows, input_key
+from aoc.search import strongly_connected_components
 
-def timed(func):
-    """
-    A decorator that prints the time a function takes to execute.
-    """
 
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        start_time = time.perf_counter()
-        result = func(*args, **kwargs)
-        end_time = time.perf_counter()
-        elapsed_time = end_time - start_time
-        print(f"Function '{func.__name__}' executed in {elapsed_time:.4f} seconds.")
-        return result
+def encode_data(data) -> dict:
+    graph, updates = data
+    rules = array("q")
+    for before, afters in graph.items():
+        if len(afters) == 0:
+            # Keeps pages that only appear after "|" as graph keys, in the same order
+            rules.extend((before, -1))
+        for after in afters:
+            rules.extend((before, after))
+    return {"rules": rules, **encode_rows(updates)}
 
-    return wrapper
+
+def decode_data(fields: dict):
+    graph = {}
+    rules = fields["rules"]
+    for i in range(0, len(rules), 2):
+        before, after = rules[i], rules[i + 1]
+        if before not in graph:
+            graph[before] = []
+        if after != -1:
+            graph[before].append(after)
+    return graph, decode_rows(fields)
 
 
-def get_data():
+@cached("day_5", encode_data, decode_data)
+def get_data(raw: str):
     updates = []
     graph = {}
     section = 1
-    with open("input.txt") as fin:
-        for line in fin:
-            line = line.strip()
-            if line == "":
-                section = 2
-                continue
-            if section == 1:
-                before, after = line.split("|")
-                before, after = int(before), int(after)
-                if before not in graph:
-                    graph[before] = []
-                if after not in graph:
-                    graph[after] = []
-                graph[before].append(after)
-            elif section == 2:
-                updates.append(list(map(int, line.split(","))))
+    for line in raw.splitlines():
+        line = line.strip()
+        if line == "":
+            section = 2
+            continue
+        if section == 1:
+            before, after = line.split("|")
+            before, after = int(before), int(after)
+            if before not in graph:
+                graph[before] = []
+            if after not in graph:
+                graph[after] = []
+            graph[before].append(after)
+        elif section == 2:
+            updates.append(list(map(int, line.split(","))))
     return graph, updates
             
 
+@dataclass
+class RuleIndex:
+    """
+    The rules compiled into a set of ``(before, after)`` pairs, next to the set of pages after each page.
+    """
+    pairs: set[tuple[int, int]]
+    successors: dict[int, frozenset[int]]
+    # Pages of every group of rules that go round in a cycle
+    cycles: list[list[int]]
+    # Position of every page in a topological order of all the rules, None if they are cyclic
+    ranks: Optional[dict[int, int]]
+
+    def rules_between(self, pages: set[int]) -> dict[int, set[int]]:
+        """
+        The pages that must come after each page, among the given pages only.
+        """
+        # Set intersections iterate over the smaller side, so this is O(k * min(k, d)) for pages with d rules
+        return {page: pages.intersection(self.successors.get(page, ())) for page in pages}
+
+    # O(k + r) for r rules between the pages of the update
+    def is_valid(self, update: list[int]) -> bool:
+        """
+        Whether every page that must come after another one of the update does, by their positions.
+        """
+        positions = {page: position for position, page in enumerate(update)}
+        for page, laters in self.rules_between(set(positions)).items():
+            position = positions[page]
+            for later in laters:
+                if positions[later] < position:
+                    return False
+        return True
+
+    # O(k + r) for r rules between the pages of the update
+    def reorder(self, update: list[int]) -> list[int]:
+        """
+        The update sorted by the global order of the pages if the rules have one, or else by Kahn's algorithm
+        on the rules between its own pages only, which can be acyclic even if all the rules are not.
+        """
+        if self.ranks is not None:
+            return sorted(update, key=lambda page: self.ranks.get(page, -1))
+        in_update = self.rules_between(set(update))
+        in_degrees = dict.fromkeys(update, 0)
+        for laters in in_update.values():
+            for later in laters:
+                in_degrees[later] += 1
+        ready = deque(page for page in update if in_degrees[page] == 0)
+        ordered = []
+        while len(ready) > 0:
+            page = ready.popleft()
+            ordered.append(page)
+            for later in in_update[page]:
+                in_degrees[later] -= 1
+                if in_degrees[later] == 0:
+                    ready.append(later)
+        if len(ordered) < len(in_degrees):
+            raise ValueError(f"The rules between the pages of {update} are cyclic")
+        return ordered
+
+
+def compile_rules(graph) -> RuleIndex:
+    pairs = {(before, after) for before, afters in graph.items() for after in afters}
+    pages = list(graph)
+    ids = {page: page_id for page_id, page in enumerate(pages)}
+    neighbours = [[ids[after] for after in graph[page]] for page in pages]
+    components = strongly_connected_components(len(pages), neighbours.__getitem__)
+    cycles = [[pages[page_id] for page_id in component] for component in components
+              if len(component) > 1 or (pages[component[0]], pages[component[0]]) in pairs]
+    ranks = None
+    if len(cycles) == 0:
+        # Components come after those they have rules to, and are single pages here
+        ranks = {pages[component[0]]: rank for rank, component in enumerate(reversed(components))}
+    successors = {page: frozenset(afters) for page, afters in graph.items()}
+    return RuleIndex(pairs, successors, cycles, ranks)
+
+
+# Compiled rule indexes, cycle analysis included, by the hash of the rules section, so that batches of
+# updates sharing the rules only compile them once. Only the most recently used are kept.
+MAX_RULE_INDEXES = 8
+_rule_indexes: OrderedDict[str, RuleIndex] = OrderedDict()
+
+
+def get_rule_index(raw: str, graph) -> RuleIndex:
+    rules, _, _ = raw.partition("\n\n")
+    key = input_key(rules)
+    if key in _rule_indexes:
+        _rule_indexes.move_to_end(key)
+    else:
+        _rule_indexes[key] = compile_rules(graph)
+        while len(_rule_indexes) > MAX_RULE_INDEXES:
+            _rule_indexes.popitem(last=False)
+    return _rule_indexes[key]
+
+
 def is_update_valid(graph, update):
     prohibited = set()
     for page in reversed(update):
@@ -51,17 +161,19 @@ def is_update_valid(graph, update):
 
 
 @timed
-def part1():
-    graph, updates = get_data()
+def part1(raw: str):
+    graph, updates = get_data(raw)
+    rule_index = get_rule_index(raw, graph)
     valid_updates = []
     for update in updates:
-        if is_update_valid(graph, update):
+        if rule_index.is_valid(update):
             valid_updates.append(update)
         
     total = 0
     for valid_update in valid_updates:
         total += valid_update[len(valid_update) // 2]
     print("Part 1:", total)
+    return total
 
 
 def merge(l1, l2, key):
@@ -92,8 +204,8 @@ def mergesort(l, key):
 
 
 @timed
-def part2_slow():
-    graph, updates = get_data()
+def part2_slow(raw: str):
+    graph, updates = get_data(raw)
     valid_updates = []
     for update in updates:
         prohibited = set()
@@ -115,11 +227,25 @@ def part2_slow():
     for valid_update in valid_updates:
         total += valid_update[len(valid_update) // 2]
     print("Part 2 - Slow:", total)
+    return total
 
 
 @timed
-def part2():
-    graph, updates = get_data()
+def part2(raw: str):
+    graph, updates = get_data(raw)
+    rule_index = get_rule_index(raw, graph)
+    total = 0
+    for update in updates:
+        if not rule_index.is_valid(update):
+            total += rule_index.reorder(update)[len(update) // 2]
+    print("Part 2:", total)
+    print("Cyclic rule components:", [len(cycle) for cycle in rule_index.cycles])
+    return total
+
+
+@timed
+def part2_mergesort(raw: str):
+    graph, updates = get_data(raw)
     valid_updates = []
     def sortkey(a, b):
         if b in graph.get(a, set()):
@@ -134,50 +260,12 @@ def part2():
     total = 0
     for valid_update in valid_updates:
         total += valid_update[len(valid_update) // 2]
-    print("Part 2:", total)
-    print("Cycle detected", detect_cycle_with_path(graph))
-
-
-def detect_cycle_with_path(graph):
-    def dfs(vertex, path):
-        if vertex in visiting:
-            # Cycle detected, extract the cycle path
-            cycle_start_index = path.index(vertex)
-            cycle = path[cycle_start_index:] + [vertex]
-            return cycle
-
-        if vertex in visited:
-            # vertex already processed, no cycle
-            return None
-
-        # Mark the vertex as visiting
-        visiting.add(vertex)
-        path.append(vertex)
-
-        for neighbor in graph.get(vertex, []):
-            result = dfs(neighbor, path)
-            if result:
-                return result
-
-        # Move the vertex from visiting to visited
-        visiting.remove(vertex)
-        visited.add(vertex)
-        path.pop()
-
-        return None
-
-    visited = set()  # vertexs that have been fully processed
-    visiting = set()  # vertexs that are currently in the recursion stack
-
-    for vertex in graph:
-        result = dfs(vertex, [])
-        if result:
-            return result  # Return the first detected cycle
-
-    return None  # No cycles detected
+    print("Part 2 - Merge sort:", total)
+    return total
 
 
 if __name__ == "__main__":
-    part1()
-    part2()
-    part2_slow()
+    raw = Path(__file__).with_name("input.txt").read_text()
+    part1(raw)
+    part2(raw)
+    part2_slow(raw)
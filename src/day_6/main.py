@@ -1,7 +1,13 @@
-import time
+import multiprocessing
+import sys
+from bisect import bisect_left, bisect_right
 from collections import defaultdict
-from functools import wraps
-from itertools import product
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator, Optional
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from aoc.benchmark import timed
 
 # Left, up, right, down, clockwise
 DIRECTIONS = [
@@ -11,96 +17,163 @@ DIRECTIONS = [
     (0, 1),
 ]
 
-def timed(func):
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        start_time = time.perf_counter()
-        result = func(*args, **kwargs)
-        end_time = time.perf_counter()
-        elapsed_time = end_time - start_time
-        print(f"Function '{func.__name__}' executed in {elapsed_time:.4f} seconds.")
-        return result
-
-    return wrapper
-
 
-def load_data():
+def load_data(raw: str):
     obstacles = set()
     initial_position = ()
-    with open("input.txt") as fin:
-        for line_no, line in enumerate(fin.readlines()):
-            for char_no, char in enumerate(line):
-                if char == "#":
-                    obstacles.add((char_no, line_no))
-                elif char == "^":
-                    initial_position = (char_no, line_no)
-        size = (char_no + 1, line_no + 1)
-        return size, initial_position, obstacles
+    for line_no, line in enumerate(raw.splitlines()):
+        for char_no, char in enumerate(line):
+            if char == "#":
+                obstacles.add((char_no, line_no))
+            elif char == "^":
+                initial_position = (char_no, line_no)
+    size = (char_no + 1, line_no + 1)
+    return size, initial_position, obstacles
 
 
-def move(position, direction):
-    return position[0] + direction[0], position[1] + direction[1]
+class ObstacleIndex:
+    def __init__(self, size: tuple[int, int], obstacles: set[tuple[int, int]]):
+        """
+        The obstacles of every row and every column in sorted order, so that the next one in any direction
+        is a bisection.
+        """
+        self.size = size
+        self.rows: dict[int, list[int]] = defaultdict(list)
+        self.columns: dict[int, list[int]] = defaultdict(list)
+        for x, y in sorted(obstacles):
+            self.columns[x].append(y)
+        for x, y in sorted(obstacles, key=lambda obstacle: (obstacle[1], obstacle[0])):
+            self.rows[y].append(x)
 
+    def next_stop(self, position: tuple[int, int], direction_index: int,
+                  extra: Optional[tuple[int, int]] = None) -> tuple[tuple[int, int], bool]:
+        """
+        Where the guard stops walking straight from ``position``, and whether that is because the walk leaves
+        the map (stopping on its edge) rather than because of an obstacle. ``extra`` is one more obstacle.
+        """
+        x, y = position
+        step_x, step_y = DIRECTIONS[direction_index]
+        if step_y == 0:
+            line, along, across, step, size = self.rows.get(y, []), x, y, step_x, self.size[0]
+        else:
+            line, along, across, step, size = self.columns.get(x, []), y, x, step_y, self.size[1]
+        if step > 0:
+            found = bisect_right(line, along)
+            obstacle = line[found] if found < len(line) else None
+        else:
+            found = bisect_left(line, along) - 1
+            obstacle = line[found] if found >= 0 else None
+        if extra is not None:
+            extra_along, extra_across = extra if step_y == 0 else (extra[1], extra[0])
+            if extra_across == across and (extra_along - along) * step > 0 and (
+                    obstacle is None or (obstacle - extra_along) * step > 0):
+                obstacle = extra_along
+        if obstacle is None:
+            stop = size - 1 if step > 0 else 0
+        else:
+            stop = obstacle - step
+        return ((stop, y) if step_y == 0 else (x, stop)), obstacle is None
 
-@timed
-def part1():
-    (size_x, size_y), position, obstacles = load_data()
-    positions_passed = set()
-    direction_index = 1  # Up
+
+# O(t * log n) for t turns
+def patrol(index: ObstacleIndex, position: tuple[int, int], direction_index: int = 1,
+           extra: Optional[tuple[int, int]] = None) -> Iterator[tuple[tuple[int, int], tuple[int, int], int, bool]]:
+    """
+    The straight walks of the guard as (from, to, direction index, leaves the map), jumping from turn to
+    turn. Stops when the guard leaves the map or is about to repeat a walk, i.e. is in a loop.
+    """
+    turns = set()
     while True:
-        pos_x, pos_y = position
-        if not (0 <= pos_x < size_x):
-            break
-        if not (0 <= pos_y < size_y):
-            break
-        # Try to move, if not possible, then keep turning
-        positions_passed.add(position)
-        while True:
-            potential_move = move(position, DIRECTIONS[direction_index])
-            if potential_move in obstacles:
-                direction_index = (direction_index + 1) % len(DIRECTIONS)
-            else:
-                position = potential_move
-                break
-    print("Part 1:", len(positions_passed))
+        stop, leaves = index.next_stop(position, direction_index, extra)
+        yield position, stop, direction_index, leaves
+        if leaves:
+            return
+        position = stop
+        direction_index = (direction_index + 1) % len(DIRECTIONS)
+        if (position, direction_index) in turns:
+            return
+        turns.add((position, direction_index))
+
+
+def is_loop(index: ObstacleIndex, position: tuple[int, int], direction_index: int = 1,
+            extra: Optional[tuple[int, int]] = None) -> bool:
+    *_, (_, _, _, leaves) = patrol(index, position, direction_index, extra)
+    return not leaves
+
+
+@timed
+def part1(raw: str):
+    size, position, obstacles = load_data(raw)
+    size_x, size_y = size
+    index = ObstacleIndex(size, obstacles)
+    passed = bytearray(size_x * size_y)
+    for (from_x, from_y), (to_x, to_y), _, _ in patrol(index, position):
+        # Mark every cell of the walk at once
+        start = min(from_y, to_y) * size_x + min(from_x, to_x)
+        end = max(from_y, to_y) * size_x + max(from_x, to_x) + 1
+        step = 1 if from_y == to_y else size_x
+        passed[start:end:step] = b"\x01" * len(range(start, end, step))
+    positions_passed = passed.count(1)
+    print("Part 1:", positions_passed)
+    return positions_passed
+
+
+# (cell, where the guard is right before first stepping onto it, direction index it faces there)
+Candidate = tuple[tuple[int, int], tuple[int, int], int]
+
+
+def candidates(index: ObstacleIndex, start_position: tuple[int, int]) -> list[Candidate]:
+    """
+    The cells of the part 1 path, the only ones where an obstacle changes anything. Up to the first time
+    the guard steps onto a cell, the path is the same with an obstacle there, so its loop check can start
+    from that state.
+    """
+    found = {start_position: None}
+    for (from_x, from_y), (to_x, to_y), direction_index, _ in patrol(index, start_position):
+        step_x, step_y = DIRECTIONS[direction_index]
+        for step in range(1, abs(to_x - from_x) + abs(to_y - from_y) + 1):
+            cell = (from_x + step * step_x, from_y + step * step_y)
+            if cell not in found:
+                found[cell] = (cell[0] - step_x, cell[1] - step_y), direction_index
+    return [(cell, *state) for cell, state in found.items() if state is not None]
+
+
+def count_loops(index: ObstacleIndex, shard: list[Candidate]) -> int:
+    return sum(is_loop(index, position, direction_index, extra=cell) for cell, position, direction_index in shard)
+
+
+# The obstacle index of a worker process, built once by the pool's initializer
+_worker_index: Optional[ObstacleIndex] = None
+
+
+def _init_worker(size: tuple[int, int], obstacles: set[tuple[int, int]]):
+    global _worker_index
+    _worker_index = ObstacleIndex(size, obstacles)
+
+
+def _count_loops_in_worker(shard: list[Candidate]) -> int:
+    return count_loops(_worker_index, shard)
 
 
 @timed
-def part2():
-    (size_x, size_y), start_position, obstacles = load_data()
-    new_obstacles = set()
-    potential_new_obstacles = product(range(size_x), range(size_y))
-    for potential_obstacle in potential_new_obstacles:
-        if potential_obstacle in obstacles or potential_obstacle == start_position:
-            continue
-        direction_index = 1  # Up
-        position = start_position
-        test_obstacles = obstacles.copy()
-        test_obstacles.add(potential_obstacle)
-        passed_positions = defaultdict(set)
-        while True:
-            pos_x, pos_y = position
-            if not (0 <= pos_x < size_x):
-                break
-            if not (0 <= pos_y < size_y):
-                break
-            if direction_index in passed_positions[position]:
-                # Now in a loop
-                new_obstacles.add(potential_obstacle)
-                break
-            passed_positions[position].add(direction_index)
-            # Try to move, if not possible, then keep turning
-            while True:
-                direction = DIRECTIONS[direction_index]
-                potential_move = move(position, direction)
-                if potential_move in test_obstacles:
-                    direction_index = (direction_index + 1) % len(DIRECTIONS)
-                else:
-                    position = potential_move
-                    break
-    print("Part 2:", len(new_obstacles))
+def part2(raw: str, workers: int = 1):
+    size, start_position, obstacles = load_data(raw)
+    index = ObstacleIndex(size, obstacles)
+    to_check = candidates(index, start_position)
+    # Daemonic processes, such as the scheduler's, can't start a pool
+    if workers <= 1 or multiprocessing.current_process().daemon:
+        loops = count_loops(index, to_check)
+    else:
+        # A few shards per worker, interleaved so that long and short patrols are spread out
+        shard_count = workers * 4
+        shards = [to_check[shard::shard_count] for shard in range(shard_count)]
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(size, obstacles)) as executor:
+            loops = sum(executor.map(_count_loops_in_worker, shards))
+    print("Part 2:", loops)
+    return loops
 
 
 if __name__ == '__main__':
-    part1()
-    part2()
\ No newline at end of file
+    raw = Path(__file__).with_name("input.txt").read_text()
+    part1(raw)
+    part2(raw)
\ No newline at end of file
@@ -1,27 +1,14 @@
-import time
+import sys
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
 from enum import Enum
-from functools import wraps
-from typing import Callable
-from math import ceil,log10
-
-
-def timed(arg=None):
-    def decorator(func):
-        custom_name = arg if isinstance(arg, str) else None
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            start_time = time.perf_counter()
-            result = func(*args, **kwargs)
-            end_time = time.perf_counter()
-            elapsed_time = end_time - start_time
-            function_name = custom_name or func.__name__
-            print(f"Function '{function_name}' executed in {elapsed_time:.6f} seconds.")
-            return result
-        return wrapper
-    if callable(arg):
-        return decorator(arg)
-    return decorator
+from pathlib import Path
+from typing import Callable, Optional, Sequence
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from aoc.benchmark import timed
+from aoc.cache import cached, decode_rows, encode_rows
 
 
 class Operator(str, Enum):
@@ -30,15 +17,27 @@ class Operator(str, Enum):
     CONCAT = "||"
 
 
-def get_data():
+def encode_data(data: dict[int, list[int]]) -> dict:
+    return {"results": array("q", data), **encode_rows(list(data.values()))}
+
+
+def decode_data(fields: dict) -> dict[int, list[int]]:
+    return dict(zip(fields["results"], decode_rows(fields)))
+
+
+@cached("day_7", encode_data, decode_data)
+def get_data(raw: str):
+    """
+    >>> get_data.parse("9223372036854775808: 9223372036854775807 1")
+    {9223372036854775808: [9223372036854775807, 1]}
+    """
     data = {}
-    with open("input.txt") as fin:
-        for line in fin:
-            line = line.strip()
-            result, elements = line.split(": ")
-            result = int(result)
-            num_elements = list(map(int, elements.split(" ")))
-            data[result] = num_elements
+    for line in raw.splitlines():
+        line = line.strip()
+        result, elements = line.split(": ")
+        result = int(result)
+        num_elements = list(map(int, elements.split(" ")))
+        data[result] = num_elements
     return data
 
 
@@ -50,8 +49,22 @@ def add(a: int, b: int):
     return a + b
 
 
+# 10 ** digits, extended on demand by digit_power
+POWERS_OF_TEN = [10 ** digits for digits in range(19)]
+
+
+def digit_power(b: int) -> int:
+    """
+    The power of ten that shifts a number left by the digits of ``b``, e.g. 100 for 10 to 99.
+    """
+    while b >= POWERS_OF_TEN[-1]:
+        POWERS_OF_TEN.append(POWERS_OF_TEN[-1] * 10)
+    # 0 still has a digit
+    return POWERS_OF_TEN[bisect_right(POWERS_OF_TEN, max(b, 1))]
+
+
 def concat(a: int, b: int) -> int:
-    return int(f"{a}{b}")
+    return a * digit_power(b) + b
 
 
 def rev_mul(res: int, a: int):
@@ -63,7 +76,7 @@ def rev_add(res: int, a: int):
 
 
 def rev_concat(res: int, a: int):
-    return int(str(res).removesuffix(str(a)))
+    return res // digit_power(a)
 
 
 def greater_than(res: int, b: int):
@@ -71,11 +84,42 @@ def greater_than(res: int, b: int):
 
 
 def divisible(res: int, b: int):
-    return res % b == 0
+    return b != 0 and res % b == 0
 
 
 def is_suffix(res: int, b: int):
-    return res != b and divisible(res - b, 10 ** ceil(log10(b)))
+    head, tail = divmod(res, digit_power(b))
+    return tail == b and head > 0
+
+
+@dataclass(frozen=True)
+class ReversibleOperator:
+    symbol: str
+    apply: Callable[[int, int], int]
+    # The left operand from the result and the right operand, valid when can_reverse holds
+    reverse: Callable[[int, int], int]
+    can_reverse: Callable[[int, int], bool]
+    # Right operands that lose the left one, e.g. 0 for multiplication, so that only a forward check works
+    loses_left: Optional[Callable[[int], bool]] = None
+
+
+def is_zero(b: int):
+    return b == 0
+
+
+OPERATORS = {
+    Operator.MULTIPLY: ReversibleOperator(Operator.MULTIPLY, mul, rev_mul, divisible, is_zero),
+    Operator.ADD: ReversibleOperator(Operator.ADD, add, rev_add, greater_than),
+    Operator.CONCAT: ReversibleOperator(Operator.CONCAT, concat, rev_concat, is_suffix),
+}
+
+
+def operator_set(*symbols: str) -> tuple[ReversibleOperator, ...]:
+    """
+    The operators for the symbols, e.g. ``operator_set("*", "+")``. Other operators can be put in a set as
+    long as they are reversible.
+    """
+    return tuple(OPERATORS[Operator(symbol)] for symbol in symbols)
 
 
 def get_sequence_values_brute(sequence: list[int], operators: list[Callable[[int, int], int]]) -> set[int]:
@@ -85,23 +129,44 @@ def get_sequence_values_brute(sequence: list[int], operators: list[Callable[[int
     return set(operator(value, sequence[-1]) for operator in operators for value in get_sequence_values_brute(sequence[:-1], operators))
 
 
-def validate_sequence_prune(result: int, sequence: list[int], reverse_operators: list[Callable[[int, int], int]], validators: list[Callable[[int, int], bool]]):
-    if len(sequence) == 1:
-        return sequence[0] == result
+def sequence_values(sequence: list[int], length: int, operators: list[Callable[[int, int], int]]) -> set[int]:
+    if length == 1:
+        return {sequence[0]}
+    return get_sequence_values_brute(sequence[:length], operators)
+
+
+def validate_sequence_prune(result: int, sequence: list[int], operators: Sequence[ReversibleOperator], length: int):
+    """
+    Whether the first ``length`` numbers of the sequence can make the result, undoing the last operation with
+    each of the operators. Where the last number loses the left operand, the values the other numbers can make
+    are checked forward instead.
 
-    for reverse_operator, validator in zip(reverse_operators, validators):
-        if not validator(result, sequence[-1]):
+    >>> validate_sequence_prune(0, [5, 0], operator_set("*"), 2)
+    True
+    """
+    last = sequence[length - 1]
+    if length == 1:
+        return last == result
+
+    for operator in operators:
+        if operator.loses_left is not None and operator.loses_left(last):
+            applies = [other.apply for other in operators]
+            values = sequence_values(sequence, length - 1, applies)
+            if any(operator.apply(value, last) == result for value in values):
+                return True
+            continue
+        if not operator.can_reverse(result, last):
             # Prune all paths that are known to be invalid
             continue
-        if validate_sequence_prune(reverse_operator(result, sequence[-1]), sequence[:-1], reverse_operators, validators):
+        if validate_sequence_prune(operator.reverse(result, last), sequence, operators, length - 1):
             return True
     return False
 
 
 def solution_factory_brute(operators: list[Callable[[int, int], int]], name):
     @timed(f"{name} - Bruteforce")
-    def solve():
-        data = get_data()
+    def solve(raw: str):
+        data = get_data(raw)
         result_sum = 0
         for result, elements in data.items():
             if result in get_sequence_values_brute(elements, operators):
@@ -111,13 +176,13 @@ def solution_factory_brute(operators: list[Callable[[int, int], int]], name):
     return solve
 
 
-def solution_factory_prune(reverse_operators: list[Callable[[int, int], int]], validators: list[Callable[[int, int], bool]], name):
+def solution_factory_prune(operators: Sequence[ReversibleOperator], name):
     @timed(f"{name} - Prune")
-    def solve():
-        data = get_data()
+    def solve(raw: str):
+        data = get_data(raw)
         result_sum = 0
         for result, elements in data.items():
-            if validate_sequence_prune(result, elements, reverse_operators, validators):
+            if validate_sequence_prune(result, elements, operators, len(elements)):
                 result_sum += result
         print(f"{name}: {result_sum}")
         return result_sum
@@ -126,14 +191,16 @@ def solution_factory_prune(reverse_operators: list[Callable[[int, int], int]], v
 
 part1_brute = solution_factory_brute([mul, add], "Part 1")
 part2_brute = solution_factory_brute([mul, add, concat], "Part 2")
-part1_prune = solution_factory_prune([rev_mul, rev_add], [divisible, greater_than], "Part 1")
-part2_prune = solution_factory_prune([rev_mul, rev_add, rev_concat], [divisible, greater_than, is_suffix], "Part 2")
+part1_prune = solution_factory_prune(operator_set("*", "+"), "Part 1")
+part2_prune = solution_factory_prune(operator_set("*", "+", "||"), "Part 2")
 
 
 if __name__ == "__main__":
+    raw = Path(__file__).with_name("input.txt").read_text()
     # Both approaches are O(2^n) in worst case, but prune solution implements an AB-pruning-like functionality
     # https://en.wikipedia.org/wiki/Alpha%E2%80%93beta_pruning
-    part1_prune()  #  0.006251s
-    part1_brute()  #  0.340681s
-    part2_prune()  #  0.010736s
-    part2_brute()  # 28.680787s
+    # Timings are tracked with `python -m aoc.baseline record 7` / `python -m aoc.baseline compare 7`
+    part1_prune(raw)
+    part1_brute(raw)
+    part2_prune(raw)
+    part2_brute(raw)
@@ -1,19 +1,23 @@
+import sys
 from collections import defaultdict
 from itertools import product, combinations
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from aoc.benchmark import timed
 
 Position = tuple[int, int]
 
-def get_data():
+def get_data(raw: str):
     data: defaultdict[str, set[Position]] = defaultdict(set)
-    with open("input.txt") as fin:
-        for line_no, line in enumerate(fin):
-            line = line.strip()
-            for char_no, char in enumerate(line):
-                if char == ".":
-                    continue
-                data[char].add((char_no, line_no))
-        size = char_no + 1, line_no + 1
-        return data, size
+    for line_no, line in enumerate(raw.splitlines()):
+        line = line.strip()
+        for char_no, char in enumerate(line):
+            if char == ".":
+                continue
+            data[char].add((char_no, line_no))
+    size = char_no + 1, line_no + 1
+    return data, size
 
 
 def get_symmetric_position(side: Position, pivot: Position) -> Position:
@@ -42,8 +46,9 @@ def get_all_antinode_positions(antenna_pos_1: Position, antenna_pos_2: Position,
     return antinode_positions
 
 
-def part1():
-    data, (size_x, size_y) = get_data()
+@timed
+def part1(raw: str):
+    data, (size_x, size_y) = get_data(raw)
     antinodes: set[Position] = set()
     for position in product(range(size_x), range(size_y)):
 
@@ -57,16 +62,20 @@ def part1():
             if position in antinodes:
                 break
     print(f"Part 1: {len(antinodes)}")
+    return len(antinodes)
 
 
-def part2():
-    data, size = get_data()
+@timed
+def part2(raw: str):
+    data, size = get_data(raw)
     antinodes: set[Position] = set()
     for frequency, antennas in data.items():
         for antenna_1, antenna_2 in combinations(antennas, r=2):
             antinodes.update(get_all_antinode_positions(antenna_1, antenna_2, size))
     print(f"Part 2: {len(antinodes)}")
+    return len(antinodes)
 
 if __name__ == '__main__':
-    part1()
-    part2()
\ No newline at end of file
+    raw = Path(__file__).with_name("input.txt").read_text()
+    part1(raw)
+    part2(raw)
\ No newline at end of file
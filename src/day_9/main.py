@@ -1,44 +1,36 @@
-import time
-from functools import wraps
+import sys
+from pathlib import Path
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from aoc.benchmark import timed
 
-def timed(func):
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        start_time = time.perf_counter()
-        result = func(*args, **kwargs)
-        end_time = time.perf_counter()
-        elapsed_time = end_time - start_time
-        print(f"Function '{func.__name__}' executed in {elapsed_time:.4f} seconds.")
-        return result
 
-    return wrapper
-
-
-def get_data():
+def get_data(raw: str):
     data = []
     file_id = 0
-    with open("input.txt") as fin:
-        line = fin.read().strip()
-        for char_no, char in enumerate(line):
-            if char_no % 2 == 0:  # block
-                data.extend([file_id] * int(char))
-                file_id += 1
-            else:  # free
-                data.extend([None] * int(char))
-        return data
+    line = raw.strip()
+    for char_no, char in enumerate(line):
+        if char_no % 2 == 0:  # block
+            data.extend([file_id] * int(char))
+            file_id += 1
+        else:  # free
+            data.extend([None] * int(char))
+    return data
 
 
 @timed
-def part1():
-    data = get_data()
+def part1(raw: str):
+    data = get_data(raw)
     pointer = 0
     while True:
-        if pointer == len(data):
+        if pointer >= len(data):
             break
         if data[pointer] is None:
             while True:
                 last_elem = data.pop()
+                if len(data) <= pointer:
+                    # Only free space was left from the pointer on, and it is all popped now
+                    break
                 if last_elem is not None:
                     data[pointer] = last_elem
                     break
@@ -47,11 +39,12 @@ def part1():
     for i, file_id in enumerate(data):
         checksum += file_id * i
     print("Part 1:",  checksum)
+    return checksum
 
 
 @timed
-def part2():
-    data = get_data()
+def part2(raw: str):
+    data = get_data(raw)
     left_block_pointer = right_block_pointer = len(data) - 1
     while True:
         if left_block_pointer < 0:
@@ -113,8 +106,10 @@ def part2():
             continue
         checksum += file_id * i
     print("Part 2:",  checksum)
+    return checksum
 
 
 if __name__ == '__main__':
-    part1()
-    part2()
\ No newline at end of file
+    raw = Path(__file__).with_name("input.txt").read_text()
+    part1(raw)
+    part2(raw)
\ No newline at end of file